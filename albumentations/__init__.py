@@ -10,10 +10,9 @@ except Exception:  # noqa: BLE001
     __author__ = "Vladimir Iglovikov"
     __maintainer__ = "Vladimir Iglovikov"
 
-import os
 from contextlib import suppress
 
-from albumentations.check_version import check_for_updates
+from albumentations.check_version import ENV_NO_UPDATE, check_for_updates, env_truthy
 
 from .augmentations import *
 from .core.composition import *
@@ -24,5 +23,5 @@ with suppress(ImportError):
     from .pytorch import *
 
 # Perform the version check after all other initializations
-if os.getenv("NO_ALBUMENTATIONS_UPDATE", "").lower() not in {"true", "1"}:
+if not env_truthy(ENV_NO_UPDATE):
     check_for_updates()
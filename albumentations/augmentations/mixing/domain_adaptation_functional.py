@@ -8,12 +8,22 @@ and pixel distribution matching with various normalization techniques.
 from __future__ import annotations
 
 import abc
-from copy import deepcopy
+from copy import copy
 from typing import Literal
 
 import cv2
 import numpy as np
-from albucore import add_weighted, clip, clipped, from_float, get_num_channels, preserve_channel_dim, to_float, uint8_io
+from albucore import (
+    add_weighted,
+    clip,
+    clipped,
+    from_float,
+    get_num_channels,
+    preserve_channel_dim,
+    sz_lut,
+    uint8_io,
+)
+from scipy import fft
 from typing_extensions import Protocol
 
 import albumentations.augmentations.geometric.functional as fgeometric
@@ -26,6 +36,10 @@ __all__ = [
     "fourier_domain_adaptation",
 ]
 
+NUM_BINS = 256  # number of possible uint8 intensity values
+MAX_OPENCV_CHANNELS = 512  # CV_CN_MAX, OpenCV arrays can not have more channels
+CALC_HIST_MAX_EXACT_COUNT = 1 << 24  # float32 counts of cv2.calcHist are exact up to 2**24
+
 
 class BaseScaler:
     def __init__(self) -> None:
@@ -94,6 +108,35 @@ class BaseScaler:
         """
         raise NotImplementedError
 
+    def affine_params(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the per-feature coefficients of the fitted transform written as x * coef + bias.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The coefficient and the bias, each of shape (n_features,).
+
+        Raises:
+            NotImplementedError: This is an abstract method that must be implemented by subclasses.
+
+        """
+        raise NotImplementedError
+
+    def compose_inverse_with(self, other: BaseScaler) -> tuple[np.ndarray, np.ndarray]:
+        """Fuse `other.transform` followed by `self.inverse_transform` into a single affine map.
+
+        Both steps are affine, so applying `x * coef + bias` with the returned values gives the
+        same result as the two-step round trip while passing over the data only once.
+
+        Args:
+            other (BaseScaler): The fitted scaler whose forward transform is applied first.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The coefficient and the bias, each of shape (n_features,).
+
+        """
+        other_coef, other_bias = other.affine_params()
+        self_coef, self_bias = self.affine_params()
+        return other_coef / self_coef, (other_bias - self_bias) / self_coef
+
 
 class MinMaxScaler(BaseScaler):
     def __init__(self, feature_range: tuple[float, float] = (0.0, 1.0)) -> None:
@@ -112,10 +155,11 @@ class MinMaxScaler(BaseScaler):
 
         Note:
             When data_min equals data_max for a feature, the range is set to 1 to avoid division by zero.
+            The fitted statistics are stored as float32, which is enough for pixel data.
 
         """
-        self.data_min = np.min(x, axis=0)
-        self.data_max = np.max(x, axis=0)
+        self.data_min = np.min(x, axis=0).astype(np.float32)
+        self.data_max = np.max(x, axis=0).astype(np.float32)
         self.data_range = self.data_max - self.data_min
         # Handle case where data_min equals data_max
         self.data_range[self.data_range == 0] = 1
@@ -141,7 +185,7 @@ class MinMaxScaler(BaseScaler):
                 "Call 'fit' with appropriate arguments before using this estimator.",
             )
 
-        x_std = np.subtract(x, self.data_min).astype(float)
+        x_std = np.subtract(x, self.data_min, dtype=np.float32)
         np.divide(x_std, self.data_range, out=x_std)
         np.multiply(x_std, (self.max - self.min), out=x_std)
         np.add(x_std, self.min, out=x_std)
@@ -166,9 +210,27 @@ class MinMaxScaler(BaseScaler):
                 "This MinMaxScaler instance is not fitted yet. "
                 "Call 'fit' with appropriate arguments before using this estimator.",
             )
-        x_std = ((x - self.min) / (self.max - self.min)).astype(float)
+        x_std = ((x - self.min) / (self.max - self.min)).astype(np.float32, copy=False)
         return x_std * self.data_range + self.data_min
 
+    def affine_params(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the fitted transform as x * coef + bias.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: coef = (max - min) / data_range and bias = min - data_min * coef.
+
+        Raises:
+            ValueError: If the scaler has not been fitted yet.
+
+        """
+        if self.data_min is None or self.data_range is None:
+            raise ValueError(
+                "This MinMaxScaler instance is not fitted yet. "
+                "Call 'fit' with appropriate arguments before using this estimator.",
+            )
+        coef = (self.max - self.min) / self.data_range
+        return coef, self.min - self.data_min * coef
+
 
 class StandardScaler(BaseScaler):
     def __init__(self) -> None:
@@ -184,11 +246,23 @@ class StandardScaler(BaseScaler):
 
         Note:
             When variance is zero for a feature, the scale is set to 1 to avoid division by zero.
+            Mean and standard deviation are accumulated in float64 in a single pass with OpenCV's
+            meanStdDev, without the centered copy of the data np.var makes.
 
         """
-        self.mean = np.mean(x, axis=0)
-        self.var = np.var(x, axis=0)
-        self.scale = np.sqrt(self.var)
+        num_features = x.shape[1]
+        if num_features > MAX_OPENCV_CHANNELS:
+            self.mean = np.asarray(np.mean(x, axis=0, dtype=np.float64))
+            self.var = np.var(x, axis=0, dtype=np.float64)
+            self.scale = np.sqrt(self.var)
+        else:
+            if x.dtype not in (np.uint8, np.float32, np.float64):
+                x = x.astype(np.float64)
+            # Every feature is a channel of a (n_samples, 1) image
+            mean, std = cv2.meanStdDev(x.reshape(-1, 1, num_features))
+            self.mean = mean.ravel()
+            self.scale = std.ravel()
+            self.var = self.scale**2
         # Handle case where variance is zero
         self.scale[self.scale == 0] = 1
 
@@ -236,6 +310,23 @@ class StandardScaler(BaseScaler):
             )
         return (x * self.scale) + self.mean
 
+    def affine_params(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the fitted transform as x * coef + bias.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: coef = 1 / std and bias = -mean / std.
+
+        Raises:
+            ValueError: If the scaler has not been fitted yet.
+
+        """
+        if self.mean is None or self.scale is None:
+            raise ValueError(
+                "This StandardScaler instance is not fitted yet. "
+                "Call 'fit' with appropriate arguments before using this estimator.",
+            )
+        return 1 / self.scale, -self.mean / self.scale
+
 
 class TransformerInterface(Protocol):
     @abc.abstractmethod
@@ -288,7 +379,8 @@ class DomainAdapter:
         color_conversions: tuple[None, None] = (None, None),
     ):
         self.color_in, self.color_out = color_conversions
-        self.source_transformer = deepcopy(transformer)
+        # fit() rebinds every fitted attribute instead of mutating it, so a shallow copy is enough
+        self.source_transformer = copy(transformer)
         self.target_transformer = transformer
         self.num_channels = get_num_channels(ref_img)
         self.target_transformer.fit(self.flatten(ref_img))
@@ -323,8 +415,11 @@ class DomainAdapter:
     def flatten(self, img: np.ndarray) -> np.ndarray:
         """Flatten the image into a 2D array of pixels.
 
-        Converts the image to the target color space, normalizes to float values,
-        and reshapes to (n_pixels, n_channels).
+        Converts the image to the target color space and reshapes to (n_pixels, n_channels).
+
+        Pixels are kept in their original dtype and scale and no float copy is made here:
+        the scalers and PCA are affine, so they promote to float themselves, and the result of
+        `inverse_transform` is in the same scale that `reconstruct` expects.
 
         Args:
             img (np.ndarray): The input image to flatten.
@@ -334,10 +429,15 @@ class DomainAdapter:
 
         """
         img = self.to_colorspace(img)
-        img = to_float(img)
         return img.reshape(-1, self.num_channels)
 
-    def reconstruct(self, pixels: np.ndarray, height: int, width: int) -> np.ndarray:
+    def reconstruct(
+        self,
+        pixels: np.ndarray,
+        height: int,
+        width: int,
+        dtype: np.dtype = np.dtype(np.uint8),
+    ) -> np.ndarray:
         """Reconstruct an image from flattened pixels.
 
         Reshapes the pixels back to image format and converts back to the original color space.
@@ -346,13 +446,14 @@ class DomainAdapter:
             pixels (np.ndarray): The flattened pixels with shape (n_pixels, n_channels).
             height (int): The height of the output image.
             width (int): The width of the output image.
+            dtype (np.dtype): The dtype of the input image, the pixels are clipped to its value range.
 
         Returns:
             np.ndarray: The reconstructed image with shape (height, width) for grayscale
                 or (height, width, n_channels) for color images.
 
         """
-        pixels = clip(pixels, np.uint8, inplace=True)
+        pixels = clip(pixels, dtype, inplace=True)
         if self.num_channels == 1:
             return self.from_colorspace(pixels.reshape(height, width))
         return self.from_colorspace(pixels.reshape(height, width, self.num_channels))
@@ -366,16 +467,27 @@ class DomainAdapter:
         pixels = self.flatten(image)
         self.source_transformer.fit(pixels)
 
-        if (
-            hasattr(self.target_transformer, "components_")
-            and hasattr(self.source_transformer, "components_")
-            and self._pca_sign(self.target_transformer) != self._pca_sign(self.source_transformer)
-        ):
-            self.target_transformer.components_ *= -1
+        if isinstance(self.source_transformer, BaseScaler) and isinstance(self.target_transformer, BaseScaler):
+            # Both steps are affine: apply the fused map in a single pass over the pixels
+            coef, bias = self.target_transformer.compose_inverse_with(self.source_transformer)
+            result = np.multiply(pixels, coef.astype(np.float32), dtype=np.float32)
+            np.add(result, bias.astype(np.float32), out=result)
+            return self.reconstruct(result, height, width, image.dtype)
+
+        if isinstance(self.target_transformer, PCA) and isinstance(self.source_transformer, PCA):
+            # Project onto the source components and back from the target ones in a single pass.
+            # Sign alignment is folded into the (n_features, n_features) matrix instead of
+            # flipping the target components.
+            sign = -1 if self._pca_sign(self.target_transformer) != self._pca_sign(self.source_transformer) else 1
+            projection = sign * (self.source_transformer.components_.T @ self.target_transformer.components_)
+            bias = self.target_transformer.mean.ravel() - self.source_transformer.mean.ravel() @ projection
+            result = np.matmul(pixels, projection.astype(np.float32), dtype=np.float32)
+            np.add(result, bias.astype(np.float32), out=result)
+            return self.reconstruct(result, height, width, image.dtype)
 
         representation = self.source_transformer.transform(pixels)
         result = self.target_transformer.inverse_transform(representation)
-        return self.reconstruct(result, height, width)
+        return self.reconstruct(result, height, width, image.dtype)
 
 
 @clipped
@@ -412,31 +524,54 @@ def adapt_pixel_distribution(
     if img_num_channels != ref_num_channels:
         raise ValueError("Input image and reference image must have the same number of channels.")
 
-    if img_num_channels == 1:
-        img = np.squeeze(img)
-        ref = np.squeeze(ref)
-
     if img.shape != ref.shape:
-        ref = cv2.resize(ref, dsize=img.shape[:2], interpolation=cv2.INTER_AREA)
-
-    original_dtype = img.dtype
-
-    if original_dtype == np.float32:
-        img = from_float(img, np.uint8)
-        ref = from_float(ref, np.uint8)
+        # cv2.resize drops a trailing singleton channel, restore the layout of the input
+        ref = cv2.resize(ref, dsize=(img.shape[1], img.shape[0]), interpolation=cv2.INTER_AREA).reshape(
+            img.shape[:2] + ref.shape[2:],
+        )
 
+    # The fitted maps are affine and scale equivariant, so float32 images are adapted directly
+    # in their [0, 1] range without a round trip through uint8
     transformer = {"pca": PCA, "standard": StandardScaler, "minmax": MinMaxScaler}[transform_type]()
     adapter = DomainAdapter(transformer=transformer, ref_img=ref)
-    transformed = adapter(img).astype(np.float32)
+    transformed = adapter(img).reshape(img.shape)
+
+    # Both images have the input dtype, for uint8 the blend is rounded and saturated in the same pass
+    return cv2.addWeighted(img, 1 - weight, transformed, weight, 0).reshape(img.shape)
+
+
+def _unshifted_slices(start: int, stop: int, size: int) -> list[slice]:
+    """Map a window given on a centered (fftshift-ed) axis onto the unshifted FFT layout.
+
+    In the unshifted layout the zero frequency sits at index 0 and negative frequencies wrap
+    around to the end of the axis, so a centered window splits into at most two slices.
+    """
+    low, high = start - size // 2, stop - size // 2
+    slices = []
+    if high > 0:
+        slices.append(slice(max(low, 0), high))
+    if low < 0:
+        slices.append(slice(size + low, size + min(high, 0)))
+    return slices
 
-    result = img.astype(np.float32) * (1 - weight) + transformed * weight
 
-    return result if original_dtype == np.uint8 else to_float(result)
+def _low_freq_weights(image_shape: tuple[int, int], beta: float) -> np.ndarray:
+    """Build the low-frequency window weights on the unshifted ``rfft2`` layout.
 
+    The window is the same centered square as in the fftshift-ed full spectrum. Since only
+    non-negative column frequencies are stored, it is symmetrized around the zero frequency
+    (weights 1 or 1/2), which gives exactly the same image as mutating the full spectrum and
+    taking the real part of its inverse transform. Columns past the last one inside the window
+    are dropped, so the weights have shape (H, num_cols) with num_cols possibly 0.
 
-def low_freq_mutate(amp_src: np.ndarray, amp_trg: np.ndarray, beta: float) -> np.ndarray:
-    image_shape = amp_src.shape[:2]
+    Args:
+        image_shape (tuple[int, int]): Spatial shape (H, W) of the transformed image.
+        beta (float): Relative size of the low-frequency window.
+
+    Returns:
+        np.ndarray: The (H, num_cols) weights of the window.
 
+    """
     border = int(np.floor(min(image_shape) * beta))
 
     center_x, center_y = fgeometric.center(image_shape)
@@ -445,8 +580,56 @@ def low_freq_mutate(amp_src: np.ndarray, amp_trg: np.ndarray, beta: float) -> np
 
     h1, h2 = max(0, int(center_y - border)), min(int(center_y + border), height)
     w1, w2 = max(0, int(center_x - border)), min(int(center_x + border), width)
-    amp_src[h1:h2, w1:w2] = amp_trg[h1:h2, w1:w2]
-    return amp_src
+
+    row_mask = np.zeros(height, dtype=np.float32)
+    col_mask = np.zeros(width, dtype=np.float32)
+    for rows in _unshifted_slices(h1, h2, height):
+        row_mask[rows] = 1
+    for cols in _unshifted_slices(w1, w2, width):
+        col_mask[cols] = 1
+
+    # Masks of the window reflected through the zero frequency: index k -> -k (mod size)
+    row_mask_reflected = np.roll(row_mask[::-1], 1)
+    col_mask_reflected = np.roll(col_mask[::-1], 1)
+
+    half_width = width // 2 + 1
+    used_cols = np.flatnonzero(col_mask[:half_width] + col_mask_reflected[:half_width])
+    num_cols = used_cols[-1] + 1 if used_cols.size and row_mask.any() else 0
+
+    return (np.outer(row_mask, col_mask[:num_cols]) + np.outer(row_mask_reflected, col_mask_reflected[:num_cols])) / 2
+
+
+def low_freq_mutate(fft_src: np.ndarray, fft_trg: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Replace the low-frequency amplitudes of the source spectrum with those of the target.
+
+    Both spectra are expected in the unshifted ``rfft2`` layout of an (H, W, C) image,
+    i.e. (H, W // 2 + 1, C), and the window is given by `_low_freq_weights`, so it is computed
+    once for all channels.
+
+    The source phase is kept by rescaling the complex coefficients with the ratio of the new and
+    the old amplitude, so the phase is never materialized and only the window is touched.
+
+    Args:
+        fft_src (np.ndarray): Source spectrum, modified in place.
+        fft_trg (np.ndarray): Target spectrum.
+        weights (np.ndarray): The (H, num_cols) window weights from `_low_freq_weights`.
+
+    Returns:
+        np.ndarray: The mutated source spectrum.
+
+    """
+    num_cols = weights.shape[-1]
+    if num_cols == 0:
+        return fft_src
+
+    window = fft_src[:, :num_cols]
+    amp_src = np.abs(window)
+    mutated_amp = amp_src + weights[..., np.newaxis] * (np.abs(fft_trg[:, :num_cols]) - amp_src)
+
+    window *= np.divide(mutated_amp, amp_src, out=np.ones_like(mutated_amp), where=amp_src > 0)
+    # Zero coefficients have no phase (np.angle gives 0), so they take the mutated amplitude as is
+    np.copyto(window, mutated_amp, where=amp_src == 0)
+    return fft_src
 
 
 @clipped
@@ -476,19 +659,18 @@ def fourier_domain_adaptation(img: np.ndarray, target_img: np.ndarray, beta: flo
         - Both input images are converted to float32 for processing.
         - The function handles both grayscale (2D) and color (3D) images.
         - For grayscale images, an extra dimension is added to facilitate uniform processing.
-        - The adaptation is performed channel-wise for color images.
+        - All channels are transformed in a single batched real-input FFT call (scipy.fft.rfft2).
         - The output is clipped to the valid range and preserves the original number of channels.
 
-    The adaptation process involves the following steps for each channel:
-    1. Compute the 2D Fourier Transform of both source and target images.
-    2. Shift the zero frequency component to the center of the spectrum.
-    3. Extract amplitude and phase information from the source image's spectrum.
-    4. Mutate the source amplitude using the target amplitude and the beta parameter.
-    5. Combine the mutated amplitude with the original phase.
-    6. Perform the inverse Fourier Transform to obtain the adapted channel.
+    The adaptation process involves the following steps:
+    1. Compute the 2D Fourier Transform of all channels of both source and target images.
+    2. Mutate the low-frequency amplitudes of the source spectrum using the target amplitudes
+       and the beta parameter, keeping the phase of the source.
+    3. Perform the inverse Fourier Transform to obtain the adapted image.
 
-    The `low_freq_mutate` function (not shown here) is responsible for the actual
-    amplitude mutation, focusing on low-frequency components which carry style information.
+    The `low_freq_mutate` function is responsible for the actual amplitude mutation, focusing on
+    low-frequency components which carry style information. It works on the unshifted half
+    spectrum returned by rfft2, so no fftshift/ifftshift passes are needed.
 
     Examples:
         >>> import numpy as np
@@ -503,45 +685,27 @@ def fourier_domain_adaptation(img: np.ndarray, target_img: np.ndarray, beta: flo
             https://openaccess.thecvf.com/content_CVPR_2020/papers/Yang_FDA_Fourier_Domain_Adaptation_for_Semantic_Segmentation_CVPR_2020_paper.pdf
 
     """
-    src_img = img.astype(np.float32)
-    trg_img = target_img.astype(np.float32)
+    # The FFT runs directly on the interleaved (H, W, C) layout: pocketfft transforms the channels
+    # of a row together, which is faster than planar copies and needs no transposes.
+    # float32 input keeps the whole computation in single precision without any copy.
+    src_img = img.astype(np.float32, copy=False)
+    trg_img = target_img.astype(np.float32, copy=False)
 
     if src_img.ndim == MONO_CHANNEL_DIMENSIONS:
-        src_img = np.expand_dims(src_img, axis=-1)
+        src_img = src_img[..., np.newaxis]
     if trg_img.ndim == MONO_CHANNEL_DIMENSIONS:
-        trg_img = np.expand_dims(trg_img, axis=-1)
-
-    num_channels = src_img.shape[-1]
-
-    # Prepare container for the output image
-    src_in_trg = np.zeros_like(src_img)
-
-    for channel_id in range(num_channels):
-        # Perform FFT on each channel
-        fft_src = np.fft.fft2(src_img[:, :, channel_id])
-        fft_trg = np.fft.fft2(trg_img[:, :, channel_id])
-
-        # Shift the zero frequency component to the center
-        fft_src_shifted = np.fft.fftshift(fft_src)
-        fft_trg_shifted = np.fft.fftshift(fft_trg)
+        trg_img = trg_img[..., np.newaxis]
 
-        # Extract amplitude and phase
-        amp_src, pha_src = np.abs(fft_src_shifted), np.angle(fft_src_shifted)
-        amp_trg = np.abs(fft_trg_shifted)
+    image_shape = src_img.shape[:2]
 
-        # Mutate the amplitude part of the source with the target
-        mutated_amp = low_freq_mutate(amp_src.copy(), amp_trg, beta)
+    # Images are real, so only the non-negative column frequencies need to be computed
+    fft_src = fft.rfft2(src_img, axes=(0, 1))
+    fft_trg = fft.rfft2(trg_img, axes=(0, 1))
 
-        # Combine the mutated amplitude with the original phase
-        fft_src_mutated = np.fft.ifftshift(mutated_amp * np.exp(1j * pha_src))
+    # Mutate the low-frequency amplitudes of the source with the target, keeping the source phase
+    fft_src = low_freq_mutate(fft_src, fft_trg, _low_freq_weights(image_shape, beta))
 
-        # Perform inverse FFT
-        src_in_trg_channel = np.fft.ifft2(fft_src_mutated)
-
-        # Store the result in the corresponding channel of the output image
-        src_in_trg[:, :, channel_id] = np.real(src_in_trg_channel)
-
-    return src_in_trg
+    return fft.irfft2(fft_src, s=image_shape, axes=(0, 1), overwrite_x=True)
 
 
 @clipped
@@ -582,13 +746,23 @@ def apply_histogram(img: np.ndarray, reference_image: np.ndarray, blend_ratio: f
     if img.shape[:2] != reference_image.shape[:2]:
         reference_image = cv2.resize(reference_image, dsize=(img.shape[1], img.shape[0]))
 
-    reference_image = reference_image.reshape(img.shape)
+    if reference_image.shape != img.shape:
+        # cv2.resize drops a trailing singleton channel, restore the layout of the input
+        reference_image = reference_image.reshape(img.shape)
+
+    if img.dtype != np.uint8:
+        # Match histograms between the images
+        matched = match_histograms(img, reference_image)
 
-    # Match histograms between the images
-    matched = match_histograms(img, reference_image)
+        # Blend the original image and the matched image
+        return add_weighted(matched, blend_ratio, img, 1 - blend_ratio)
 
-    # Blend the original image and the matched image
-    return add_weighted(matched, blend_ratio, img, 1 - blend_ratio)
+    # For uint8 input the blended value only depends on the intensity, so the blend is folded into the tables
+    luts = _match_histogram_luts(img, reference_image)
+    identity = np.broadcast_to(np.arange(NUM_BINS, dtype=np.uint8), luts.shape)
+    blended_luts = add_weighted(luts, blend_ratio, np.ascontiguousarray(identity), 1 - blend_ratio)
+
+    return _apply_channel_luts(img, blended_luts)
 
 
 @uint8_io
@@ -610,32 +784,64 @@ def match_histograms(image: np.ndarray, reference: np.ndarray) -> np.ndarray:
         ValueError: Thrown when the number of channels in the input image and the reference differ.
 
     """
+    # The mapping only depends on the intensity, so it is built once as an uint8 table per channel
+    return _apply_channel_luts(image, _match_histogram_luts(image, reference))
+
+
+def _match_histogram_luts(image: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Build the (num_channels, 256) uint8 lookup tables matching the histograms of an uint8 image to reference."""
     if reference.dtype != np.uint8:
         reference = from_float(reference, np.uint8)
 
-    matched = np.empty(image.shape, dtype=np.uint8)
-
     num_channels = image.shape[-1]
 
-    for channel in range(num_channels):
-        matched_channel = _match_cumulative_cdf(image[..., channel], reference[..., channel]).astype(np.uint8)
-        matched[..., channel] = matched_channel
+    src_counts = _channel_histograms(image, num_channels)
+    tmpl_counts = _channel_histograms(reference, num_channels)
 
-    return matched
+    # calculate normalized quantiles for each channel
+    src_quantiles = np.cumsum(src_counts, axis=1) / (image.size // num_channels)
+    tmpl_quantiles = np.cumsum(tmpl_counts, axis=1) / (reference.size // num_channels)
 
+    return np.stack(
+        [
+            _match_cumulative_cdf(src_quantiles[channel], tmpl_quantiles[channel], tmpl_counts[channel])
+            for channel in range(num_channels)
+        ],
+    )
 
-def _match_cumulative_cdf(source: np.ndarray, template: np.ndarray) -> np.ndarray:
-    src_lookup = source.reshape(-1)
-    src_counts = np.bincount(src_lookup)
-    tmpl_counts = np.bincount(template.reshape(-1))
 
-    # omit values where the count was 0
-    tmpl_values = np.nonzero(tmpl_counts)[0]
-    tmpl_counts = tmpl_counts[tmpl_values]
+def _apply_channel_luts(image: np.ndarray, luts: np.ndarray) -> np.ndarray:
+    """Apply one 256-entry uint8 lookup table per channel of an uint8 image."""
+    result = np.empty_like(image)
+    for channel, lut in enumerate(luts):
+        result[..., channel] = sz_lut(image[..., channel], lut, inplace=False)
+    return result
 
-    # calculate normalized quantiles for each array
-    src_quantiles = np.cumsum(src_counts) / source.size
-    tmpl_quantiles = np.cumsum(tmpl_counts) / template.size
 
-    interp_a_values = np.interp(src_quantiles, tmpl_quantiles, tmpl_values)
-    return interp_a_values[src_lookup].reshape(source.shape).astype(np.uint8)
+def _channel_histograms(image: np.ndarray, num_channels: int) -> np.ndarray:
+    """Compute the 256-bin histograms of all channels of an uint8 image as int64 counts.
+
+    cv2.calcHist reads every channel in place, without the index arrays a bincount over the
+    interleaved pixels needs. It only takes images with a channel axis and at most
+    MAX_OPENCV_CHANNELS channels, and counts in float32, which is exact up to
+    CALC_HIST_MAX_EXACT_COUNT per bin. Other images are counted with one bincount call.
+    """
+    if (
+        image.ndim == MONO_CHANNEL_DIMENSIONS
+        or num_channels > MAX_OPENCV_CHANNELS
+        or image.size // num_channels > CALC_HIST_MAX_EXACT_COUNT
+    ):
+        offsets = np.arange(0, num_channels * NUM_BINS, NUM_BINS, dtype=np.int32)
+        values = image.reshape(-1, num_channels) + offsets
+        return np.bincount(values.reshape(-1), minlength=num_channels * NUM_BINS).reshape(num_channels, NUM_BINS)
+
+    return np.stack(
+        [cv2.calcHist([image], [channel], None, [NUM_BINS], [0, NUM_BINS]).ravel() for channel in range(num_channels)],
+    ).astype(np.int64)
+
+
+def _match_cumulative_cdf(src_quantiles: np.ndarray, tmpl_quantiles: np.ndarray, tmpl_counts: np.ndarray) -> np.ndarray:
+    """Build the 256-entry uint8 lookup table mapping source intensities onto template intensities."""
+    # omit values where the count was 0
+    tmpl_values = np.nonzero(tmpl_counts)[0]
+    return np.interp(src_quantiles, tmpl_quantiles[tmpl_values], tmpl_values).astype(np.uint8)
@@ -175,12 +175,14 @@ class PCA:
 
         Args:
             x (np.ndarray): Training data of shape (n_samples, n_features).
-                Data will be automatically converted to float64 for computation.
+                uint8, float32 and float64 data is used as is, other dtypes are converted to float64.
 
         Note:
             - The data is automatically centered (mean-subtracted) during fitting
             - Components are sorted by explained variance (highest first)
-            - Uses OpenCV's PCACompute2 for efficient computation
+            - When n_samples >= n_features the covariance matrix is accumulated directly from the
+              input with OpenCV's calcCovarMatrix, so no float64 or centered copy of the data is made
+            - Otherwise OpenCV's PCACompute2 is used
 
         Examples:
             >>> import numpy as np
@@ -191,14 +193,29 @@ class PCA:
             >>> print(pca.components_.shape)  # (3, 10)
 
         """
-        x = x.astype(np.float64, copy=False)  # avoid unnecessary copy if already float64
         n_samples, n_features = x.shape
 
         # Determine the number of components if not set
         if self.n_components is None:
             self.n_components = min(n_samples, n_features)
 
-        self.mean, eigenvectors, eigenvalues = cv2.PCACompute2(x, mean=None, maxComponents=self.n_components)
+        if n_samples < n_features:
+            x = x.astype(np.float64, copy=False)  # avoid unnecessary copy if already float64
+            self.mean, eigenvectors, eigenvalues = cv2.PCACompute2(x, mean=None, maxComponents=self.n_components)
+        else:
+            if x.dtype not in (np.uint8, np.float32, np.float64):
+                x = x.astype(np.float64)
+            # The mean is an output here, an empty array lets OpenCV allocate it
+            covariance, self.mean = cv2.calcCovarMatrix(
+                x,
+                np.empty((0,), np.float64),
+                cv2.COVAR_NORMAL | cv2.COVAR_ROWS | cv2.COVAR_SCALE,
+                ctype=cv2.CV_64F,
+            )
+            _, eigenvalues, eigenvectors = cv2.eigen(covariance)
+            eigenvectors = eigenvectors[: self.n_components]
+            eigenvalues = eigenvalues[: self.n_components]
+
         self.components_ = eigenvectors
         self.explained_variance_ = eigenvalues.flatten()
 
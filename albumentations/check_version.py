@@ -11,8 +11,8 @@ Features:
     - Support for pre-release versions
 
 Environment Variables:
-    NO_ALBUMENTATIONS_UPDATE: Set to "1" or "true" to disable update checks
-    ALBUMENTATIONS_OFFLINE: Set to "1" or "true" to force offline mode
+    NO_ALBUMENTATIONS_UPDATE: Set to "1", "true", "yes" or "on" to disable update checks
+    ALBUMENTATIONS_OFFLINE: Set to "1", "true", "yes" or "on" to force offline mode
 
 Usage:
     >>> from albumentations.check_version import check_for_updates
@@ -21,55 +21,135 @@ Usage:
 
 from __future__ import annotations
 
+import contextlib
+import errno
 import functools
-import json
 import os
 import re
-import socket
-import urllib.error
-import urllib.request
+import struct
+import threading
+import time
 import warnings
-from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from albumentations import __version__ as current_version
 
+# The network, JSON and temporary file modules are imported by the functions that use them,
+# so that `import albumentations` doesn't pay for them when the cache is fresh or checks are disabled
+
 # Constants
 HTTP_TIMEOUT = 3.0
 PYPI_URL = "https://pypi.org/pypi/albumentationsx/json"
 CACHE_HOURS = 24
+CACHE_SECONDS = CACHE_HOURS * 3600
 
 # Environment variables
 ENV_NO_UPDATE = "NO_ALBUMENTATIONS_UPDATE"
 ENV_OFFLINE = "ALBUMENTATIONS_OFFLINE"
 
+# Values that turn a flag environment variable on, compared case-insensitively
+_TRUTHY = frozenset({"1", "true", "yes", "on"})
+
 # DNS servers for connectivity check
 DNS_SERVERS = [("1.1.1.1", 53), ("8.8.8.8", 53)]  # Cloudflare and Google
+DNS_TIMEOUT = 1.0
+
+# connect_ex results of a non-blocking connect that is still in progress
+_CONNECT_IN_PROGRESS = frozenset({errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN})
+
+# Semantic versioning with optional pre-release, compiled once at import
+_SEMVER_RE = re.compile(
+    r"^(\d+)\.(\d+)\.(\d+)"  # Major.Minor.Patch
+    r"(?:-(alpha|beta|rc)(?:\.(\d+))?)?"  # Optional pre-release with optional number
+    r"(?:\+.*)?$",  # Optional metadata
+)
+
+# Pre-releases get negative values, so that they sort before the stable release
+_PRE_RELEASE_ORDER = {"alpha": -3, "beta": -2, "rc": -1}
+
+# Parse result of a string that is not a valid version, sorts before every valid version
+INVALID_VERSION = (-1, -1, -1, -1, -1)
+
+
+def env_truthy(name: str) -> bool:
+    """Check whether a flag environment variable is set to a true value.
+
+    Args:
+        name: Name of the environment variable
+
+    Returns:
+        True if the variable is set to "1", "true", "yes" or "on" in any case
+
+    """
+    value = os.environ.get(name)
+    return value is not None and value.lower() in _TRUTHY
+
+
+def _probe_dns_servers(servers: list[tuple[str, int]], timeout: float = DNS_TIMEOUT) -> bool:
+    """Connect to all servers at once and wait until the first connection succeeds.
+
+    Non-blocking connects are started for every server and watched by a single selector,
+    so an unreachable server costs at most `timeout` in total instead of once per server.
+
+    Args:
+        servers: (ip, port) pairs of servers to connect to, IPv4 or IPv6 addresses
+        timeout: Maximum number of seconds to wait for any connection
 
+    Returns:
+        True if a connection to any of the servers succeeded
+
+    """
+    import selectors
+    import socket
 
-def _try_dns_connect(server: str, port: int) -> bool:
-    """Try to connect to a DNS server."""
+    sockets: list[socket.socket] = []
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.settimeout(1)
-            sock.connect((server, port))
-            return True
-    except (socket.timeout, OSError):
+        with selectors.DefaultSelector() as selector:
+            for server, port in servers:
+                family = socket.AF_INET6 if ":" in server else socket.AF_INET
+                try:
+                    sock = socket.socket(family, socket.SOCK_STREAM)
+                except OSError:
+                    continue
+                sockets.append(sock)
+                sock.setblocking(False)
+                result = sock.connect_ex((server, port))
+                if result == 0:
+                    return True
+                if result in _CONNECT_IN_PROGRESS:
+                    selector.register(sock, selectors.EVENT_WRITE, sock)
+
+            deadline = time.monotonic() + timeout
+            while selector.get_map() and (remaining := deadline - time.monotonic()) > 0:
+                for key, _ in selector.select(remaining):
+                    # The connect finished, it succeeded if the socket has no pending error
+                    if key.data.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                        return True
+                    selector.unregister(key.fileobj)
+    except OSError:
         return False
+    finally:
+        for sock in sockets:
+            with contextlib.suppress(OSError):
+                sock.close()
+    return False
 
 
 @functools.lru_cache(maxsize=1)
 def check_connectivity() -> bool:
     """Check internet connectivity using DNS servers first, then HTTP."""
     # Check offline mode
-    if os.environ.get(ENV_OFFLINE, "").lower() in {"1", "true"}:
+    if env_truthy(ENV_OFFLINE):
         return False
 
     # Try DNS servers first (faster)
-    if any(_try_dns_connect(server, port) for server, port in DNS_SERVERS):
+    if _probe_dns_servers(DNS_SERVERS):
         return True
 
     # Fallback to HTTP
+    import urllib.error
+    import urllib.request
+
     try:
         opener = urllib.request.build_opener()
         opener.open("https://pypi.org/simple/", timeout=1)
@@ -79,20 +159,53 @@ def check_connectivity() -> bool:
         return True
 
 
-def fetch_pypi_version() -> str | None:
-    """Fetch the latest version from PyPI."""
+def _fetch_pypi_release(cached_version: str | None = None, etag: str = "") -> tuple[str, str] | None:
+    """Fetch the latest version and the ETag of the response from PyPI.
+
+    With a cached version and its ETag the request is conditional: when the release data did
+    not change, PyPI answers 304 Not Modified without a body and the cached version is kept.
+
+    Args:
+        cached_version: Version from the cache, even if it expired
+        etag: ETag of the response the cached version came from
+
+    Returns:
+        Tuple of (latest_version, etag) or None if the version could not be fetched
+
+    """
     if not check_connectivity():
         return None
 
+    import json
+    import urllib.error
+    import urllib.request
+    from http import HTTPStatus
+
+    headers = {"User-Agent": f"albumentationsx/{current_version}"}
+    if cached_version and etag:
+        headers["If-None-Match"] = etag
+
     try:
         opener = urllib.request.build_opener()
-        with opener.open(PYPI_URL, timeout=HTTP_TIMEOUT) as response:
+        request = urllib.request.Request(PYPI_URL, headers=headers)
+        with opener.open(request, timeout=HTTP_TIMEOUT) as response:
             data = json.loads(response.read().decode("utf-8"))
-            return data.get("info", {}).get("version")
+            version = data.get("info", {}).get("version")
+            return (version, response.headers.get("ETag") or "") if version else None
+    except urllib.error.HTTPError as error:
+        if error.code == HTTPStatus.NOT_MODIFIED and cached_version:
+            return cached_version, etag
+        return None
     except (urllib.error.URLError, json.JSONDecodeError, KeyError, OSError):
         return None
 
 
+def fetch_pypi_version() -> str | None:
+    """Fetch the latest version from PyPI."""
+    release = _fetch_pypi_release()
+    return release[0] if release else None
+
+
 def get_cache_dir() -> Path:
     """Get platform-appropriate cache directory."""
     # Check for environment variable override
@@ -110,81 +223,127 @@ def get_cache_dir() -> Path:
     return base / "albumentationsx"
 
 
-CACHE_FILE = get_cache_dir() / "version_cache.json"
+CACHE_FILE = get_cache_dir() / "version_cache.bin"
 
+# Cache record: little-endian float64 unix timestamp, then the UTF-8 version and the ETag
+# of the PyPI response, each terminated by NUL
+_CACHE_TIMESTAMP = struct.Struct("<d")
 
-def read_cache() -> str | None:
-    """Read version from cache file if not expired."""
-    if not CACHE_FILE.exists():
-        return None
+# Serializes cache writes within the process, so that concurrent writers don't race on the rename
+_cache_write_lock = threading.Lock()
+
+# (version, timestamp) of the last cache record this process read or wrote, saves the disk read
+# on later calls, the cache file stays the store shared between processes
+_latest_memo: tuple[str, float] | None = None
+
+
+def _read_cache_record() -> tuple[float, str, str] | None:
+    """Read the cache record, whether it expired or not.
+
+    Returns:
+        Tuple of (timestamp, version, etag) or None if there is no valid record
 
+    """
     try:
-        with CACHE_FILE.open("r") as f:
-            data = json.load(f)
-
-        # Check expiration
-        timestamp_str = data.get("timestamp")
-        if not timestamp_str:
-            return None
-
-        # Handle different timestamp formats
-        if isinstance(timestamp_str, (int, float)):
-            # Legacy format - unix timestamp
-            timestamp = datetime.fromtimestamp(timestamp_str, tz=timezone.utc)
-        else:
-            # ISO format string
-            timestamp = datetime.fromisoformat(timestamp_str)
-
-        if datetime.now(timezone.utc) - timestamp > timedelta(hours=CACHE_HOURS):
-            return None
-
-        return data.get("version")
-    except (json.JSONDecodeError, KeyError, ValueError, OSError, TypeError):
+        data = CACHE_FILE.read_bytes()
+    except OSError:
         return None
 
+    # Too short or not terminated means the file is malformed or was cut off
+    if len(data) <= _CACHE_TIMESTAMP.size or not data.endswith(b"\0"):
+        return None
+
+    (timestamp,) = _CACHE_TIMESTAMP.unpack_from(data)
 
-def write_cache(version: str) -> None:
-    """Write version to cache file."""
     try:
-        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with CACHE_FILE.open("w") as f:
-            json.dump(
-                {
-                    "version": version,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                },
-                f,
-            )
-    except OSError:
-        pass  # Fail silently
+        version, _, etag = data[_CACHE_TIMESTAMP.size : -1].decode().partition("\0")
+    except UnicodeDecodeError:
+        return None
+
+    return (timestamp, version, etag) if version else None
+
 
+def _is_fresh(timestamp: float) -> bool:
+    """Check that a cache timestamp has not expired, a NaN timestamp never is fresh."""
+    return time.time() - timestamp <= CACHE_SECONDS
 
-def parse_version(version: str) -> tuple[int, ...] | None:
+
+def read_cache() -> str | None:
+    """Read version from cache file if not expired."""
+    record = _read_cache_record()
+    if record is None or not _is_fresh(record[0]):
+        return None
+    return record[1]
+
+
+def write_cache(version: str, etag: str = "") -> None:
+    """Write version to cache file.
+
+    Args:
+        version: The latest version
+        etag: ETag of the PyPI response the version came from
+
+    """
+    import tempfile
+
+    global _latest_memo  # noqa: PLW0603
+
+    timestamp = time.time()
+    record = _CACHE_TIMESTAMP.pack(timestamp) + f"{version}\0{etag}\0".encode()
+    with _cache_write_lock:
+        _latest_memo = (version, timestamp)
+        try:
+            CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file in the same directory and rename it over the cache,
+            # so that concurrent readers see either the old or the new record, never a partial one
+            with tempfile.NamedTemporaryFile(
+                dir=CACHE_FILE.parent,
+                prefix=".version_cache_",
+                delete=False,
+            ) as tmp_file:
+                tmp_file.write(record)
+            tmp_path = Path(tmp_file.name)
+        except OSError:
+            return  # Fail silently
+
+        try:
+            tmp_path.replace(CACHE_FILE)
+        except OSError:
+            # Clean up temp file
+            with contextlib.suppress(OSError):
+                tmp_path.unlink()
+            return
+
+        # Remove the JSON cache of earlier versions, which is never read again
+        with contextlib.suppress(OSError):
+            CACHE_FILE.with_suffix(".json").unlink(missing_ok=True)
+
+
+@functools.lru_cache(maxsize=256)
+def parse_version(version: str) -> tuple[int, ...]:
     """Parse version string into comparable tuple.
 
+    Results are cached, the same few version strings are parsed over and over.
+    Invalid versions are parsed to INVALID_VERSION, which sorts before every valid version.
+
     Examples:
         "1.4.24" -> (1, 4, 24, 0, 0)
         "1.4.0-beta.2" -> (1, 4, 0, -2, 2)
+        "not-a-version" -> (-1, -1, -1, -1, -1)
 
     """
     # Match semantic versioning with optional pre-release
-    match = re.match(
-        r"^(\d+)\.(\d+)\.(\d+)"  # Major.Minor.Patch
-        r"(?:-(alpha|beta|rc)(?:\.(\d+))?)?"  # Optional pre-release with optional number
-        r"(?:\+.*)?$",  # Optional metadata
-        version,
-    )
+    match = _SEMVER_RE.match(version)
 
     if not match:
-        return None
+        return INVALID_VERSION
 
     major, minor, patch, pre_type, pre_num = match.groups()
     result = [int(major), int(minor), int(patch)]
 
     # Handle pre-release (negative values for proper ordering)
     if pre_type:
-        pre_order = {"alpha": -3, "beta": -2, "rc": -1}
-        result.extend([pre_order[pre_type], int(pre_num or 0)])
+        result.extend([_PRE_RELEASE_ORDER[pre_type], int(pre_num or 0)])
     else:
         result.extend([0, 0])  # Stable version
 
@@ -194,18 +353,28 @@ def parse_version(version: str) -> tuple[int, ...] | None:
 def get_latest_version() -> str | None:
     """Get the latest version with caching."""
     # Check if disabled
-    if os.environ.get(ENV_NO_UPDATE, "").lower() in {"1", "true"}:
+    if env_truthy(ENV_NO_UPDATE):
         return None
 
-    # Try cache first
-    if cached := read_cache():
-        return cached
+    global _latest_memo  # noqa: PLW0603
 
-    # Fetch from PyPI
-    version = fetch_pypi_version()
-    if version:
-        write_cache(version)
+    # Try the in-process copy of the cache, then the cache file
+    memo = _latest_memo
+    if memo is not None and _is_fresh(memo[1]):
+        return memo[0]
 
+    record = _read_cache_record()
+    if record is not None and _is_fresh(record[0]):
+        _latest_memo = (record[1], record[0])
+        return record[1]
+
+    # Fetch from PyPI, conditionally if there is an expired record
+    release = _fetch_pypi_release(*record[1:]) if record is not None else _fetch_pypi_release()
+    if release is None:
+        return None
+
+    version, etag = release
+    write_cache(version, etag)
     return version
 
 
@@ -223,18 +392,19 @@ def check_for_updates(verbose: bool = True) -> tuple[bool, str | None]:
     if not latest:
         return False, None
 
-    latest_parsed = parse_version(latest)
-    current_parsed = parse_version(current_version)
-
-    if not latest_parsed or not current_parsed:
+    # Users on the latest version are the common case, no parsing needed
+    if latest == current_version:
         return False, latest
 
-    if latest_parsed > current_parsed:
+    # An invalid latest version sorts first and is never newer,
+    # an invalid current version (e.g. "unknown" without package metadata) can't be compared
+    current_parsed = parse_version(current_version)
+    if current_parsed != INVALID_VERSION and parse_version(latest) > current_parsed:
         if verbose:
             warnings.warn(
                 f"A new version of AlbumentationsX ({latest}) is available! "
                 f"Your version is {current_version}. "
-                f"Upgrade using: pip install -U albumentationsx",
+                "Upgrade using: pip install -U albumentationsx",
                 UserWarning,
                 stacklevel=2,
             )
@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import base64
 import json
-import urllib.request
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
@@ -55,6 +54,10 @@ class MixpanelBackend:
             event: The ComposeInitEvent to send
 
         """
+        # Only needed once an event is sent, urllib.request is slow to import
+        import urllib.error
+        import urllib.request
+
         try:
             # Convert event to Mixpanel format
             event_data: dict[str, Any] = {
@@ -64,7 +67,9 @@ class MixpanelBackend:
                     "distinct_id": event.user_id or "anonymous",
                     "token": self.PROJECT_TOKEN,
                     # Event metadata
-                    "$insert_id": event.session_id,  # For deduplication
+                    # For deduplication, a pipeline is sent at most once per session
+                    "$insert_id": f"{event.session_id[:16]}-{event.pipeline_hash[:16]}",
+                    "session_id": event.session_id,
                     "time": self._parse_timestamp(event.timestamp),
                     # Environment info
                     "pipeline_hash": event.pipeline_hash,
@@ -5,7 +5,8 @@ from __future__ import annotations
 import functools
 import os
 import platform
-import subprocess
+import sys
+import threading
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -15,17 +16,64 @@ from albumentations.core.analytics.events import ComposeInitEvent
 if TYPE_CHECKING:
     from albumentations.core.composition import Compose
 
+# Guards the first collection, so that concurrent first calls run the probes only once
+_environment_lock = threading.Lock()
+
+# Environment variables set by CI/CD services
+_CI_ENV_VARS = frozenset(
+    {
+        "CI",
+        "CONTINUOUS_INTEGRATION",
+        "GITHUB_ACTIONS",
+        "GITLAB_CI",
+        "JENKINS_HOME",
+        "TRAVIS",
+        "CIRCLECI",
+        "BUILDKITE",
+        "DRONE",
+        "TEAMCITY_VERSION",
+        "BITBUCKET_BUILD_NUMBER",
+        "SEMAPHORE",
+        "APPVEYOR",
+        "CODEBUILD_BUILD_ID",
+        "AZURE_PIPELINES_BUILD_ID",
+        "TF_BUILD",
+    },
+)
+
+# Control group paths of processes running in a container mention the container runtime
+_CONTAINER_CGROUP_MARKERS = (b"docker", b"containerd", b"kubepods")
+
+# Major and minor version of the running interpreter, e.g. "3.12"
+_PYTHON_VERSION = f"{sys.version_info.major}.{sys.version_info.minor}"
+
+# The host doesn't change while the process runs, both come from a single os.uname() call.
+# platform.processor() is not cached here, on Linux it starts a `uname -p` process
+_SYSTEM = platform.system()
+_MACHINE = platform.machine()
+
 
 def get_environment_info() -> dict[str, Any]:
     """Collect basic environment information without external dependencies.
 
+    The host does not change during the lifetime of the process, so the information is
+    collected once, even when the first calls come from several threads, and every call
+    returns a copy of it.
+
     Returns:
         Dictionary with OS, CPU, GPU (if available), RAM, and environment type
 
     """
+    with _environment_lock:
+        return dict(_get_environment_info())
+
+
+@functools.lru_cache(maxsize=1)
+def _get_environment_info() -> dict[str, Any]:
+    """Collect the environment information, cached for the lifetime of the process."""
     return {
         "albumentationsx_version": albumentationsx_version,
-        "python_version": f"{platform.python_version_tuple()[0]}.{platform.python_version_tuple()[1]}",
+        "python_version": _PYTHON_VERSION,
         "os": get_os_info(),
         "cpu": get_cpu_model(),
         "gpu": get_gpu_name(),
@@ -34,6 +82,7 @@ def get_environment_info() -> dict[str, Any]:
     }
 
 
+@functools.lru_cache(maxsize=1)
 def detect_environment() -> str:
     """Detect the runtime environment.
 
@@ -48,7 +97,7 @@ def detect_environment() -> str:
         return "ci"
 
     # Check Colab
-    if _check_module("google.colab"):
+    if _is_colab():
         return "colab"
 
     # Check Kaggle
@@ -59,11 +108,8 @@ def detect_environment() -> str:
         pass
 
     # Check Docker
-    try:
-        if Path("/.dockerenv").exists() or Path("/proc/self/cgroup").is_file():
-            return "docker"
-    except OSError:
-        pass
+    if _is_docker():
+        return "docker"
 
     # Check Jupyter
     if _check_jupyter():
@@ -72,16 +118,39 @@ def detect_environment() -> str:
     return "local"
 
 
-def _check_module(module_name: str) -> bool:
-    """Check if a module is available."""
-    try:
-        import importlib.util
+def reset_environment_cache() -> None:
+    """Clear the cached environment information, so it is collected again on the next call."""
+    with _environment_lock:
+        for getter in (
+            _get_environment_info,
+            detect_environment,
+            get_os_info,
+            _get_linux_os_info,
+            get_cpu_model,
+            get_gpu_name,
+            get_ram_size,
+        ):
+            getter.cache_clear()
 
-        spec = importlib.util.find_spec(module_name)
-    except (ImportError, AttributeError):
+
+def _is_colab() -> bool:
+    """Check if running in Google Colab.
+
+    The Colab runtime sets COLAB_RELEASE_TAG and imports google.colab at startup, so no
+    import machinery has to search sys.path for it.
+    """
+    return "COLAB_RELEASE_TAG" in os.environ or "google.colab" in sys.modules
+
+
+def _is_docker() -> bool:
+    """Check if running in a Docker (or another containerd based) container."""
+    try:
+        if Path("/.dockerenv").exists():
+            return True
+        cgroup = Path("/proc/self/cgroup").read_bytes()
+    except OSError:
         return False
-    else:
-        return spec is not None
+    return any(marker in cgroup for marker in _CONTAINER_CGROUP_MARKERS)
 
 
 def _check_jupyter() -> bool:
@@ -111,16 +180,16 @@ def _get_linux_os_info() -> str:
     except (OSError, AttributeError):
         pass
 
-    # Fallback to /etc/os-release
+    # Fallback to /etc/os-release, read at once.
+    # The leading newline lets the key match at the start of any line, including the first one
     try:
-        os_release_path = Path("/etc/os-release")
-        if os_release_path.exists():
-            with os_release_path.open() as f:
-                for line in f:
-                    if line.startswith("PRETTY_NAME="):
-                        return line.split("=", 1)[1].strip().strip('"')
+        os_release = "\n" + Path("/etc/os-release").read_text(encoding="utf-8", errors="replace")
     except OSError:
         pass
+    else:
+        start = os_release.find("\nPRETTY_NAME=")
+        if start != -1:
+            return os_release[start + len("\nPRETTY_NAME=") :].split("\n", 1)[0].strip().strip('"')
 
     return "Linux"
 
@@ -128,7 +197,7 @@ def _get_linux_os_info() -> str:
 @functools.lru_cache(maxsize=1)
 def get_os_info() -> str:
     """Get OS information in a simple format."""
-    system = platform.system()
+    system = _SYSTEM
 
     if system == "Darwin":  # macOS
         version = platform.mac_ver()[0]
@@ -156,23 +225,16 @@ def get_cpu_model() -> str:
         return processor
 
     # Special handling for Apple Silicon on macOS
-    if platform.system() == "Darwin":
-        try:
-            # Check for Apple Silicon
-            result = subprocess.run(
-                ["sysctl", "-n", "machdep.cpu.brand_string"],  # noqa: S607
-                check=False,
-                capture_output=True,
-                text=True,
-                timeout=1,
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                return result.stdout.strip()
-        except (OSError, subprocess.SubprocessError):
-            pass
+    if _SYSTEM == "Darwin":
+        # Read it in process, the sysctl command is only a fallback
+        brand = _sysctl_value("machdep.cpu.brand_string")
+        if brand and (name := brand.rstrip(b"\x00").decode(errors="ignore").strip()):
+            return name
+        if output := _run_command("sysctl", "-n", "machdep.cpu.brand_string"):
+            return output
 
     # Fallback to machine architecture
-    if machine := platform.machine():
+    if machine := _MACHINE:
         # Provide meaningful names for common architectures
         arch_names = {
             "arm64": "ARM64",
@@ -189,55 +251,131 @@ def get_cpu_model() -> str:
 
 @functools.lru_cache(maxsize=1)
 def get_gpu_name() -> str | None:
-    """Get GPU name if torch is available and CUDA is accessible."""
-    try:
-        import torch
+    """Get GPU name if torch is already imported and CUDA is accessible.
 
-        if torch.cuda.is_available():
-            return torch.cuda.get_device_name(0)
-    except ImportError:
-        pass
+    Torch is never imported here: its import costs hundreds of milliseconds,
+    and a GPU only matters to users who already work with torch.
+    """
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        return torch.cuda.get_device_name(0)
     return None
 
 
+def _sysctl_value(name: str) -> bytes | None:
+    """Read a sysctl value on macOS with libc's sysctlbyname, without starting a process.
+
+    Returns:
+        The raw value or None if it could not be read
+
+    """
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL(None)
+        size = ctypes.c_size_t(0)
+        # The first call only queries the size of the value
+        if libc.sysctlbyname(name.encode(), None, ctypes.byref(size), None, 0) != 0 or not size.value:
+            return None
+        buffer = ctypes.create_string_buffer(size.value)
+        if libc.sysctlbyname(name.encode(), buffer, ctypes.byref(size), None, 0) != 0:
+            return None
+    except (ImportError, OSError, AttributeError):
+        return None
+    else:
+        return buffer.raw[: size.value]
+
+
+def _run_command(*args: str) -> str | None:
+    """Run a command and return its stripped output.
+
+    subprocess is imported here, it is only needed when the in-process probes fail.
+    The command gets no stdin and no inherited file descriptors, and runs in its own
+    session, so it can't read from the terminal or receive its signals.
+
+    Returns:
+        The output of the command or None if it could not be run or failed
+
+    """
+    import subprocess
+
+    try:
+        result = subprocess.run(  # noqa: S603 - only called with fixed commands
+            args,
+            check=False,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+            timeout=1,
+            close_fds=True,
+            start_new_session=True,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _get_ram_windows_api() -> float | None:
+    """Get RAM size on Windows with GlobalMemoryStatusEx, without starting a process."""
+    # ctypes.windll only exists on Windows, the platform check also lets type checkers skip it elsewhere
+    if sys.platform != "win32":
+        return None
+
+    try:
+        import ctypes
+
+        class MemoryStatusEx(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MemoryStatusEx()
+        status.dwLength = ctypes.sizeof(MemoryStatusEx)
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return None
+    except (ImportError, OSError, AttributeError):
+        return None
+    else:
+        return round(status.ullTotalPhys / (1024**3), 1)
+
+
 def _get_ram_linux() -> float | None:
     """Get RAM size on Linux."""
-    meminfo_path = Path("/proc/meminfo")
-    if meminfo_path.exists():
-        with meminfo_path.open() as f:
-            for line in f:
-                if line.startswith("MemTotal:"):
-                    kb = int(line.split()[1])
-                    return round(kb / (1024 * 1024), 1)
-    return None
+    # A single read of the whole file, a missing file raises OSError which the caller handles
+    meminfo = Path("/proc/meminfo").read_bytes()
+    start = meminfo.find(b"MemTotal:")
+    if start == -1:
+        return None
+    kb = int(meminfo[start:].split(maxsplit=2)[1])
+    return round(kb / (1024 * 1024), 1)
 
 
 def _get_ram_macos() -> float | None:
     """Get RAM size on macOS."""
-    result = subprocess.run(
-        ["sysctl", "-n", "hw.memsize"],  # noqa: S607
-        check=False,
-        capture_output=True,
-        text=True,
-        timeout=1,
-    )
-    if result.returncode == 0:
-        bytes_val = int(result.stdout.strip())
+    if (memsize := _sysctl_value("hw.memsize")) is not None:
+        return round(int.from_bytes(memsize, sys.byteorder) / (1024**3), 1)
+
+    if output := _run_command("sysctl", "-n", "hw.memsize"):
+        bytes_val = int(output)
         return round(bytes_val / (1024**3), 1)
     return None
 
 
 def _get_ram_windows() -> float | None:
     """Get RAM size on Windows."""
-    result = subprocess.run(
-        ["wmic", "computersystem", "get", "TotalPhysicalMemory"],  # noqa: S607
-        check=False,
-        capture_output=True,
-        text=True,
-        timeout=1,
-    )
-    if result.returncode == 0:
-        lines = result.stdout.strip().split("\n")
+    if (ram := _get_ram_windows_api()) is not None:
+        return ram
+
+    if output := _run_command("wmic", "computersystem", "get", "TotalPhysicalMemory"):
+        lines = output.split("\n")
         if len(lines) > 1:
             bytes_val = int(lines[1].strip())
             return round(bytes_val / (1024**3), 1)
@@ -248,7 +386,7 @@ def _get_ram_windows() -> float | None:
 def get_ram_size() -> float | None:
     """Get RAM size in GB without external dependencies."""
     try:
-        system = platform.system()
+        system = _SYSTEM
 
         if system == "Linux":
             return _get_ram_linux()
@@ -257,7 +395,7 @@ def get_ram_size() -> float | None:
         if system == "Windows":
             return _get_ram_windows()
 
-    except (OSError, ValueError, subprocess.SubprocessError):
+    except (OSError, ValueError):
         pass
 
     return None
@@ -270,25 +408,8 @@ def is_ci_environment() -> bool:
         True if any CI environment variable is detected
 
     """
-    ci_env_vars = [
-        "CI",
-        "CONTINUOUS_INTEGRATION",
-        "GITHUB_ACTIONS",
-        "GITLAB_CI",
-        "JENKINS_HOME",
-        "TRAVIS",
-        "CIRCLECI",
-        "BUILDKITE",
-        "DRONE",
-        "TEAMCITY_VERSION",
-        "BITBUCKET_BUILD_NUMBER",
-        "SEMAPHORE",
-        "APPVEYOR",
-        "CODEBUILD_BUILD_ID",
-        "AZURE_PIPELINES_BUILD_ID",
-        "TF_BUILD",
-    ]
-    return any(os.getenv(var) for var in ci_env_vars)
+    # A single set intersection with the environment, only the matches are checked for a non-empty value
+    return any(os.environ[var] for var in _CI_ENV_VARS.intersection(os.environ))
 
 
 def is_pytest_running() -> bool:
@@ -301,46 +422,56 @@ def is_pytest_running() -> bool:
     return "PYTEST_CURRENT_TEST" in os.environ
 
 
-def _extract_transforms_from_compose(transform: Any, transforms: list[str]) -> None:
-    """Recursively extract transform names from a compose structure."""
-    if hasattr(transform, "transforms") and transform.transforms:
-        for t in transform.transforms:
-            _extract_transform_names(t, transforms)
-    elif hasattr(transform, "transforms_dict") and transform.transforms_dict:
+# Containers whose children are included in the pipeline description
+_COMPOSE_TYPES = frozenset(
+    {
+        "Compose",
+        "ReplayCompose",
+        "OneOf",
+        "SomeOf",
+        "Sequential",
+        "SelectiveChannelTransform",
+        "OneOrOther",
+        "RandomOrder",
+    },
+)
+
+
+def _get_child_transforms(transform: Any) -> list[Any]:
+    """Get the direct children of a compose structure, in order."""
+    if children := getattr(transform, "transforms", None):
+        return list(children)
+    children = []
+    if transforms_dict := getattr(transform, "transforms_dict", None):
         # For OneOf, SomeOf, etc.
-        for t in transform.transforms_dict.values():
+        for t in transforms_dict.values():
             if hasattr(t, "__iter__"):
-                for sub_t in t:
-                    _extract_transform_names(sub_t, transforms)
+                children.extend(t)
             else:
-                _extract_transform_names(t, transforms)
+                children.append(t)
+    return children
 
 
 def _extract_transform_names(transform: Any, transforms: list[str]) -> None:
-    """Extract transform names from a single transform."""
-    # Get the class name
-    class_name = transform.__class__.__name__
+    """Extract the names of a transform and of all transforms nested in it, depth first.
 
-    # Skip Lambda transforms
-    if class_name == "Lambda":
-        return
+    An explicit stack is used instead of recursion, so deeply nested pipelines cost no extra frames.
+    """
+    stack = [transform]
+    while stack:
+        current = stack.pop()
+        # Get the class name
+        class_name = type(current).__name__
 
-    # Add transform name
-    transforms.append(class_name)
+        # Skip Lambda transforms
+        if class_name == "Lambda":
+            continue
 
-    # Handle nested structures
-    compose_types = [
-        "Compose",
-        "ReplayCompose",
-        "OneOf",
-        "SomeOf",
-        "Sequential",
-        "SelectiveChannelTransform",
-        "OneOrOther",
-        "RandomOrder",
-    ]
-    if class_name in compose_types:
-        _extract_transforms_from_compose(transform, transforms)
+        transforms.append(class_name)
+
+        # Handle nested structures, reversed so that children are visited in order
+        if class_name in _COMPOSE_TYPES:
+            stack.extend(reversed(_get_child_transforms(current)))
 
 
 def _get_target_usage(compose: Compose) -> str:
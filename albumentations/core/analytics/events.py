@@ -2,14 +2,24 @@
 
 from __future__ import annotations
 
-import hashlib
-import json
-import uuid
+import functools
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
 from typing import Any
 
 
+@functools.lru_cache(maxsize=1)
+def get_session_id() -> str:
+    """Get the ID of the current session, shared by all events sent from this process.
+
+    Returns:
+        32 character hex string, generated on first use
+
+    """
+    import uuid
+
+    return uuid.uuid4().hex
+
+
 @dataclass
 class ComposeInitEvent:
     """Event data for Compose initialization tracking.
@@ -20,8 +30,8 @@ class ComposeInitEvent:
 
     # Core event data
     event_type: str = "compose_init"
-    timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
-    session_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    timestamp: str = ""  # Set by the telemetry client once the event is going to be sent
+    session_id: str = ""  # Set by the telemetry client once the event is going to be sent
     user_id: str = ""  # Persistent anonymous user ID
     pipeline_hash: str = ""
 
@@ -71,9 +81,12 @@ class ComposeInitEvent:
             transforms: List of transform names
 
         Returns:
-            SHA-256 hash of the pipeline configuration
+            32 character BLAKE2b hex digest of the pipeline configuration
 
         """
+        import hashlib
+
         # Do NOT sort transforms - order matters in augmentation pipelines!
-        pipeline_str = json.dumps(transforms, sort_keys=True)
-        return hashlib.sha256(pipeline_str.encode()).hexdigest()
+        # Class names never contain NUL, so joining on it keeps the key unambiguous
+        pipeline_key = "\x00".join(transforms).encode()
+        return hashlib.blake2b(pipeline_key, digest_size=16).hexdigest()
@@ -7,11 +7,10 @@ version checking, and other library-wide settings.
 from __future__ import annotations
 
 import json
-import os
 from pathlib import Path
 from typing import Any
 
-from albumentations.check_version import get_cache_dir
+from albumentations.check_version import ENV_NO_UPDATE, ENV_OFFLINE, env_truthy, get_cache_dir
 
 
 class SettingsManager:
@@ -49,14 +48,14 @@ class SettingsManager:
                 pass
 
         # Override with environment variables
-        if os.environ.get("ALBUMENTATIONS_NO_TELEMETRY", "").lower() in ("1", "true"):
+        if env_truthy("ALBUMENTATIONS_NO_TELEMETRY"):
             settings["telemetry"] = False
 
-        if os.environ.get("ALBUMENTATIONS_OFFLINE", "").lower() in ("1", "true"):
+        if env_truthy(ENV_OFFLINE):
             settings["telemetry"] = False
             settings["check_updates"] = False
 
-        if os.environ.get("NO_ALBUMENTATIONS_UPDATE", "").lower() in ("1", "true"):
+        if env_truthy(ENV_NO_UPDATE):
             settings["check_updates"] = False
 
         return settings
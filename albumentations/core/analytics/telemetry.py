@@ -1,13 +1,19 @@
 """Telemetry client for tracking anonymous usage statistics."""
 
+from __future__ import annotations
+
+import atexit
 import contextlib
+import os
+import queue
+import threading
 import time
-from threading import Thread
+from collections.abc import Callable
 from typing import Any
 
 from albumentations.core.analytics.backends.mixpanel import MixpanelBackend
 from albumentations.core.analytics.collectors import is_ci_environment, is_pytest_running
-from albumentations.core.analytics.events import ComposeInitEvent
+from albumentations.core.analytics.events import ComposeInitEvent, get_session_id
 from albumentations.core.analytics.settings import settings
 from albumentations.core.analytics.user_id import get_user_id_manager
 
@@ -25,7 +31,7 @@ class TelemetryClient:
     _instance = None
     _initialized = False
 
-    def __new__(cls) -> "TelemetryClient":
+    def __new__(cls) -> TelemetryClient:
         """Create or return the singleton instance."""
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -40,8 +46,39 @@ class TelemetryClient:
             self.last_send_time: float = 0
             self.rate_limit: float = 30.0  # 30 seconds between sends
             self.user_id_manager = get_user_id_manager()
+            # Makes the deduplication and rate limiting check-and-set atomic across threads
+            self._lock = threading.Lock()
             self._initialized = True
 
+    def is_active(self, telemetry: bool = True) -> bool:
+        """Check whether an event could be sent at all, before any data is collected for it.
+
+        Args:
+            telemetry: Whether telemetry is enabled for this specific instance
+
+        Returns:
+            False if telemetry is disabled for the instance, globally or in CI/test environments
+
+        """
+        return self.enabled and telemetry and settings.telemetry_enabled
+
+    def should_send(self, pipeline_hash: str) -> bool:
+        """Check whether an event for the pipeline would pass deduplication and rate limiting.
+
+        This lets the caller skip collecting environment information for events that would be dropped.
+        The checks are repeated atomically when the event is tracked.
+
+        Args:
+            pipeline_hash: Hash of the pipeline configuration
+
+        Returns:
+            True if the pipeline was not sent yet and the rate limit allows sending now
+
+        """
+        if pipeline_hash in self.sent_pipelines:
+            return False
+        return time.time() - self.last_send_time >= self.rate_limit
+
     def track_compose_init(self, compose_data: dict[str, Any], telemetry: bool = True, use_thread: bool = True) -> None:
         """Track Compose initialization event with rate limiting and deduplication.
 
@@ -51,11 +88,7 @@ class TelemetryClient:
             use_thread: If True, send telemetry in background thread (default)
 
         """
-        if not self.enabled or not telemetry:
-            return
-
-        # Check global settings
-        if not settings.telemetry_enabled:
+        if not self.is_active(telemetry):
             return
 
         # Get persistent user ID
@@ -63,36 +96,39 @@ class TelemetryClient:
         if user_id is None:  # User opted out
             return
 
-        # Deduplication check
         pipeline_hash = compose_data.get("pipeline_hash")
-        if pipeline_hash and pipeline_hash in self.sent_pipelines:
-            return  # Skip if already sent
+        with self._lock:
+            # Deduplication check
+            if pipeline_hash and pipeline_hash in self.sent_pipelines:
+                return  # Skip if already sent
+
+            # Rate limiting check
+            current_time = time.time()
+            if current_time - self.last_send_time < self.rate_limit:
+                return  # Skip if too soon
 
-        # Rate limiting check
-        current_time = time.time()
-        if current_time - self.last_send_time < self.rate_limit:
-            return  # Skip if too soon
+            # Update tracking before sending, so that concurrent calls can't send the same event
+            if pipeline_hash:
+                self.sent_pipelines.add(pipeline_hash)
+            self.last_send_time = current_time
 
-        # Add user ID to event data
-        compose_data["user_id"] = user_id
+        # Only needed once an event is going to be sent
+        from datetime import datetime, timezone
 
-        # Create event
+        # Create event, only now that it is going to be sent
         event = ComposeInitEvent(**compose_data)
+        event.user_id = user_id
+        event.timestamp = datetime.fromtimestamp(current_time, tz=timezone.utc).isoformat()
+        event.session_id = get_session_id()
 
         # Send event to backend
         if use_thread:
-            # Send in background thread
-            thread = Thread(target=self._send_event_thread, args=(event,), daemon=True)
-            thread.start()
+            # Fire and forget: the single background worker does the network call
+            get_sender().submit(self._send_event_thread, event)
         else:
             # Send synchronously (mainly for testing)
             self._send_event(event)
 
-        # Update tracking
-        if pipeline_hash:
-            self.sent_pipelines.add(pipeline_hash)
-        self.last_send_time = current_time
-
     def _send_event_thread(self, event: ComposeInitEvent) -> None:
         """Send event in thread with proper error handling.
 
@@ -143,6 +179,115 @@ class TelemetryClient:
 telemetry_client = None
 
 
+class BackgroundSender:
+    """Single daemon worker thread that runs submitted calls in order.
+
+    Unlike a ThreadPoolExecutor, whose workers are joined at interpreter exit, the daemon worker
+    never blocks exit: pending calls get at most `shutdown_timeout` seconds to finish.
+    At most `max_pending` calls wait in the queue, further calls are dropped while the worker
+    is stuck, e.g. on an unreachable network.
+    """
+
+    shutdown_timeout: float = 1.0
+    max_pending: int = 100
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[tuple[Callable[..., Any], tuple[Any, ...]]] = queue.Queue(maxsize=self.max_pending)
+        self._thread = threading.Thread(target=self._run, name="albumentations-telemetry", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> bool:
+        """Schedule fn(*args) to run on the worker thread without waiting for it.
+
+        Args:
+            fn: The callable to run
+            *args: Positional arguments for the callable
+
+        Returns:
+            True if the call was queued, False if it was dropped because the queue is full
+
+        """
+        try:
+            self._queue.put_nowait((fn, args))
+        except queue.Full:
+            return False
+        return True
+
+    def is_alive(self) -> bool:
+        """Check whether the worker thread runs in the current process.
+
+        A forked child inherits the sender, but not its worker thread.
+
+        Returns:
+            True if the worker thread is running
+
+        """
+        return self._thread.is_alive()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Wait until all calls submitted so far have run.
+
+        Args:
+            timeout: Maximum number of seconds to wait, defaults to `shutdown_timeout`
+
+        Returns:
+            True if all calls have run, False if the timeout expired first or there is no worker to run them
+
+        """
+        if not self.is_alive():
+            # Nothing would ever run the pending calls, e.g. in a forked child
+            return False
+        if timeout is None:
+            timeout = self.shutdown_timeout
+        deadline = time.monotonic() + timeout
+        done = threading.Event()
+        try:
+            # Waiting for a free slot counts against the same timeout
+            self._queue.put((done.set, ()), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(max(deadline - time.monotonic(), 0))
+
+    def _run(self) -> None:
+        while True:
+            fn, args = self._queue.get()
+            with contextlib.suppress(Exception):
+                fn(*args)
+
+
+# Single background worker that sends events, created on first send in each process
+_sender: BackgroundSender | None = None
+
+
+def _reset_sender() -> None:
+    """Forget the sender inherited by a forked child, its worker thread only runs in the parent."""
+    global _sender  # noqa: PLW0603
+    _sender = None
+
+
+if hasattr(os, "register_at_fork"):  # not available on Windows, which doesn't fork
+    os.register_at_fork(after_in_child=_reset_sender)
+
+
+def get_sender() -> BackgroundSender:
+    """Get or create the background worker used to send telemetry events.
+
+    A single worker is reused for all events instead of starting a thread per event. Pending sends
+    get a short grace period at interpreter exit, so a failing network never hangs the exit.
+    Each process gets its own worker: a sender whose worker doesn't run in this process,
+    e.g. one inherited through a fork, is replaced.
+
+    Returns:
+        The BackgroundSender of the current process
+
+    """
+    global _sender  # noqa: PLW0603
+    if _sender is None or not _sender.is_alive():
+        _sender = BackgroundSender()
+        atexit.register(_sender.drain)
+    return _sender
+
+
 def get_telemetry_client() -> TelemetryClient:
     """Get or create the global telemetry client.
 
@@ -138,29 +138,11 @@ class UserIDManager:
         if self._cache_loaded:
             return self._cached_user_id
 
-        # Check if user has opted out by looking at the file directly
         if self.user_id_file.exists():
-            try:
-                with self.user_id_file.open("r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    if data.get("user_id", "").lower() == DO_NOT_TRACK_VALUE.lower():
-                        # User has opted out
-                        self._cached_user_id = None
-                        self._cache_loaded = True
-                        return None
-            except (json.JSONDecodeError, OSError):
-                pass
-
-        # Try to read existing user ID
-        user_id = self._read_user_id()
-
-        if user_id is None and self.user_id_file.exists():
-            # File exists but returned None - user has opted out
-            self._cached_user_id = None
-            self._cache_loaded = True
-            return None
-
-        if user_id is None:
+            # A single read covers both cases: "do-not-track" or an unreadable file
+            # means the user has opted out and None is returned
+            user_id = self._read_user_id()
+        else:
             # File doesn't exist - generate new user ID
             new_user_id = str(uuid.uuid4())
 
@@ -779,20 +779,29 @@ class Compose(BaseCompose, HubMixin):
         # This ensures nested composes have main_compose=False from disable_check_args_private
         if self.main_compose and settings.telemetry_enabled:
             with contextlib.suppress(Exception):
-                client = get_telemetry_client()
+                self._track_telemetry(telemetry)
 
-                # Collect telemetry data
-                env_info = get_environment_info()
-                pipeline_info = collect_pipeline_info(self)
+    def _track_telemetry(self, telemetry: bool) -> None:
+        """Send the Compose initialization event, collecting only the data that is needed."""
+        client = get_telemetry_client()
 
-                # Combine all data
-                telemetry_data = {
-                    **env_info,
-                    **pipeline_info,
-                }
+        # Let the client decide before any data is collected,
+        # in CI and test environments nothing is collected at all
+        if not client.is_active(telemetry):
+            return
+
+        # The pipeline info is cheap and enough to tell whether the event would be dropped
+        pipeline_info = collect_pipeline_info(self)
+        if not client.should_send(pipeline_info["pipeline_hash"]):
+            return
+
+        # Combine all data
+        telemetry_data = {
+            **get_environment_info(),
+            **pipeline_info,
+        }
 
-                # Always call the client, let it decide based on telemetry parameter
-                client.track_compose_init(telemetry_data, telemetry=telemetry)
+        client.track_compose_init(telemetry_data, telemetry=telemetry)
 
     @property
     def strict(self) -> bool:
@@ -2,9 +2,10 @@
 
 import json
 import os
-from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 import socket
+import struct
+import time
 import urllib.error
 import warnings
 import sys
@@ -12,11 +13,18 @@ import sys
 import pytest
 
 from albumentations.check_version import (
-    CACHE_HOURS,
+    CACHE_SECONDS,
+    DNS_SERVERS,
     ENV_NO_UPDATE,
     ENV_OFFLINE,
+    INVALID_VERSION,
+    PYPI_URL,
+    _fetch_pypi_release,
+    _probe_dns_servers,
+    _read_cache_record,
     check_connectivity,
     check_for_updates,
+    env_truthy,
     fetch_pypi_version,
     get_latest_version,
     parse_version,
@@ -30,24 +38,35 @@ def clean_environment(monkeypatch):
     """Clean environment variables and clear caches."""
     monkeypatch.delenv(ENV_NO_UPDATE, raising=False)
     monkeypatch.delenv(ENV_OFFLINE, raising=False)
+    monkeypatch.setattr("albumentations.check_version._latest_memo", None)
 
-    # Clear LRU cache
+    # Clear LRU caches
     check_connectivity.cache_clear()
+    parse_version.cache_clear()
 
     yield
 
     # Clean up after test
     check_connectivity.cache_clear()
+    parse_version.cache_clear()
 
 
 @pytest.fixture
 def temp_cache_file(tmp_path, monkeypatch):
     """Use temporary cache file for testing."""
-    cache_file = tmp_path / "version_cache.json"
+    cache_file = tmp_path / "version_cache.bin"
     monkeypatch.setattr("albumentations.check_version.CACHE_FILE", cache_file)
+    monkeypatch.setattr("albumentations.check_version._latest_memo", None)
     return cache_file
 
 
+def set_memo(memo):
+    """Replace the in-process copy of the version cache, e.g. after editing the cache file directly."""
+    import albumentations.check_version
+
+    albumentations.check_version._latest_memo = memo
+
+
 class TestParseVersion:
     """Test version parsing functionality."""
 
@@ -71,10 +90,19 @@ class TestParseVersion:
 
     def test_parse_invalid_versions(self):
         """Test parsing of invalid version strings."""
-        assert parse_version("1.4") is None
-        assert parse_version("not-a-version") is None
-        assert parse_version("") is None
-        assert parse_version("1.2.3.4") is None
+        assert parse_version("1.4") == INVALID_VERSION
+        assert parse_version("not-a-version") == INVALID_VERSION
+        assert parse_version("") == INVALID_VERSION
+        assert parse_version("1.2.3.4") == INVALID_VERSION
+        # Invalid versions sort before every valid one
+        assert INVALID_VERSION < parse_version("0.0.0-alpha")
+
+    def test_parse_version_is_cached(self):
+        """Test that repeated parses of the same string reuse the cached result."""
+        parse_version.cache_clear()
+        first = parse_version("1.4.24")
+        assert parse_version("1.4.24") is first
+        assert parse_version.cache_info().hits == 1
 
     def test_version_comparison(self):
         """Test that parsed versions compare correctly."""
@@ -92,51 +120,96 @@ class TestParseVersion:
         assert parse_version("1.4.0-beta.1") < parse_version("1.4.0-beta.2")
 
 
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, False),
+        ("", False),
+        ("0", False),
+        ("false", False),
+        ("1", True),
+        ("true", True),
+        ("TRUE", True),
+        ("yes", True),
+        ("On", True),
+    ],
+)
+def test_env_truthy(monkeypatch, value, expected):
+    """Test which flag environment variable values count as set."""
+    if value is None:
+        monkeypatch.delenv(ENV_OFFLINE, raising=False)
+    else:
+        monkeypatch.setenv(ENV_OFFLINE, value)
+    assert env_truthy(ENV_OFFLINE) is expected
+
+
+@pytest.fixture
+def listening_server():
+    """Address of a local TCP server that accepts connections."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        yield server.getsockname()
+
+
+@pytest.fixture
+def closed_port():
+    """Address of a local port nothing listens on."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        address = sock.getsockname()
+    return address
+
+
 class TestConnectivity:
     """Test connectivity checking functionality."""
 
     def test_check_connectivity_success(self, clean_environment):
         """Test successful connectivity check."""
-        with patch("socket.socket") as mock_socket:
-            mock_sock = MagicMock()
-            # Set up context manager behavior
-            mock_socket.return_value.__enter__.return_value = mock_sock
-            mock_socket.return_value.__exit__.return_value = None
+        with patch("albumentations.check_version._probe_dns_servers", return_value=True) as mock_probe:
+            with patch("urllib.request.build_opener") as mock_opener_builder:
+                assert check_connectivity() is True
 
-            assert check_connectivity() is True
-            mock_sock.connect.assert_called_once()
-            # Should not call close explicitly since context manager handles it
-            mock_sock.close.assert_not_called()
-
-    def test_check_connectivity_partial_dns_failure(self, clean_environment):
-        """Test that connectivity check tries multiple DNS servers."""
-        call_count = 0
-
-        def socket_side_effect(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-
-            mock_sock = MagicMock()
-            if call_count == 1:
-                # First DNS server fails
-                mock_sock.__enter__.return_value.connect.side_effect = socket.error("Connection failed")
-            else:
-                # Second DNS server succeeds
-                mock_sock.__enter__.return_value = mock_sock
-
-            mock_sock.__exit__.return_value = None
-            return mock_sock
-
-        with patch("socket.socket", side_effect=socket_side_effect):
-            assert check_connectivity() is True
-            # Should have tried two sockets (first failed, second succeeded)
-            assert call_count == 2
+            mock_probe.assert_called_once_with(DNS_SERVERS)
+            # No HTTP fallback is needed
+            mock_opener_builder.assert_not_called()
+
+    def test_probe_dns_servers_success(self, listening_server):
+        """Test that a reachable server is detected."""
+        assert _probe_dns_servers([listening_server]) is True
+
+    def test_probe_dns_servers_partial_failure(self, listening_server, closed_port):
+        """Test that the probe succeeds when only some of the servers are reachable."""
+        assert _probe_dns_servers([closed_port, listening_server]) is True
+        assert _probe_dns_servers([listening_server, closed_port]) is True
+
+    def test_probe_dns_servers_all_refused(self, closed_port):
+        """Test that refused connections fail without waiting for the timeout."""
+        start = time.monotonic()
+        assert _probe_dns_servers([closed_port, closed_port], timeout=5) is False
+        assert time.monotonic() - start < 5
+
+    @pytest.mark.skipif(not socket.has_ipv6, reason="IPv6 is not supported")
+    def test_probe_dns_servers_ipv6(self):
+        """Test that IPv6 servers are probed with IPv6 sockets."""
+        try:
+            server = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+            server.bind(("::1", 0))
+        except OSError:
+            pytest.skip("IPv6 loopback is not available")
+
+        with server:
+            server.listen()
+            assert _probe_dns_servers([server.getsockname()[:2]]) is True
+
+    def test_probe_dns_servers_socket_error(self):
+        """Test that a failure to create sockets counts as no connectivity."""
+        with patch("socket.socket", side_effect=OSError("No sockets")):
+            assert _probe_dns_servers(DNS_SERVERS) is False
 
     def test_check_connectivity_dns_failure_http_success(self, clean_environment):
         """Test fallback to HTTP when DNS fails."""
-        with patch("socket.socket") as mock_socket:
-            mock_socket.side_effect = socket.error("Connection failed")
-
+        with patch("albumentations.check_version._probe_dns_servers", return_value=False):
             with patch("urllib.request.build_opener") as mock_opener_builder:
                 mock_opener = MagicMock()
                 mock_opener_builder.return_value = mock_opener
@@ -146,9 +219,7 @@ class TestConnectivity:
 
     def test_check_connectivity_all_failures(self, clean_environment):
         """Test when all connectivity checks fail."""
-        with patch("socket.socket") as mock_socket:
-            mock_socket.side_effect = socket.error("Connection failed")
-
+        with patch("albumentations.check_version._probe_dns_servers", return_value=False):
             with patch("urllib.request.build_opener") as mock_opener_builder:
                 mock_opener = MagicMock()
                 mock_opener.open.side_effect = urllib.error.URLError("Failed")
@@ -168,19 +239,14 @@ class TestConnectivity:
 
     def test_check_connectivity_cache(self, clean_environment):
         """Test that connectivity check is cached."""
-        with patch("socket.socket") as mock_socket:
-            mock_sock = MagicMock()
-            # Set up context manager behavior
-            mock_socket.return_value.__enter__.return_value = mock_sock
-            mock_socket.return_value.__exit__.return_value = None
-
+        with patch("albumentations.check_version._probe_dns_servers", return_value=True) as mock_probe:
             # First call
             assert check_connectivity() is True
-            assert mock_socket.call_count == 1
+            assert mock_probe.call_count == 1
 
             # Second call should use cache
             assert check_connectivity() is True
-            assert mock_socket.call_count == 1  # No additional calls
+            assert mock_probe.call_count == 1  # No additional calls
 
 
 class TestCacheOperations:
@@ -195,16 +261,52 @@ class TestCacheOperations:
         """Test reading when cache doesn't exist."""
         assert read_cache() is None
 
-    def test_read_expired_cache(self, temp_cache_file):
-        """Test reading expired cache."""
-        # Write old cache
-        old_time = datetime.now(timezone.utc) - timedelta(hours=CACHE_HOURS + 1)
-        with temp_cache_file.open("w") as f:
-            json.dump({
-                "version": "1.4.25",
-                "timestamp": old_time.isoformat()
-            }, f)
+    @pytest.mark.parametrize(
+        "age_seconds, expected",
+        [
+            (CACHE_SECONDS + 3600, None),
+            (CACHE_SECONDS - 3600, "1.4.25"),
+        ],
+    )
+    def test_read_expired_cache(self, temp_cache_file, age_seconds, expected):
+        """Test that the cache expires based on its raw unix timestamp."""
+        temp_cache_file.write_bytes(struct.pack("<d", time.time() - age_seconds) + b"1.4.25\0")
+
+        assert read_cache() == expected
+
+    def test_cache_file_format(self, temp_cache_file):
+        """Test that the cache is a float64 timestamp followed by the NUL terminated version and ETag."""
+        write_cache("1.4.25", '"etag-1"')
+        data = temp_cache_file.read_bytes()
 
+        (timestamp,) = struct.unpack_from("<d", data)
+        assert abs(time.time() - timestamp) < 60
+        assert data[8:] == b'1.4.25\0"etag-1"\0'
+
+    def test_write_cache_removes_legacy_json_cache(self, temp_cache_file):
+        """Test that writing the cache removes the JSON cache file of earlier versions."""
+        legacy_file = temp_cache_file.with_suffix(".json")
+        legacy_file.write_text('{"version": "1.4.24", "timestamp": "2025-01-01T00:00:00+00:00"}')
+
+        write_cache("1.4.25")
+
+        assert not legacy_file.exists()
+        assert read_cache() == "1.4.25"
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"",
+            b"\x00" * 8,
+            struct.pack("<d", float("nan")) + b"1.4.25\0",
+            struct.pack("<d", 1e18) + b"1.4.25",
+            b'{"version": "1.4.25", "timestamp": "2025-01-01T00:00:00+00:00"}',
+            struct.pack("<d", 1e18) + b"\xff\xfe\0",
+        ],
+    )
+    def test_read_invalid_cache_record(self, temp_cache_file, data):
+        """Test that truncated, legacy JSON and otherwise invalid records are ignored."""
+        temp_cache_file.write_bytes(data)
         assert read_cache() is None
 
     def test_read_malformed_cache(self, temp_cache_file):
@@ -214,6 +316,14 @@ class TestCacheOperations:
 
         assert read_cache() is None
 
+    def test_write_cache_leaves_no_temporary_files(self, temp_cache_file):
+        """Test that the temporary file is renamed into place."""
+        write_cache("1.4.25")
+        write_cache("1.4.26")
+
+        assert [path.name for path in temp_cache_file.parent.iterdir()] == [temp_cache_file.name]
+        assert read_cache() == "1.4.26"
+
     @pytest.mark.skipif(sys.platform == "win32", reason="File permission test not applicable on Windows")
     def test_cache_file_permissions_error(self, temp_cache_file, monkeypatch):
         """Test handling of permission errors."""
@@ -235,87 +345,87 @@ class TestCacheOperations:
         assert not temp_cache_file.exists(), "Cache file should not have been created when parent dir was read-only"
 
 
+@pytest.fixture
+def pypi_opener():
+    """Factory for an opener mock that answers with the given body, headers or error."""
+
+    def _make(body=b"", headers=None, error=None):
+        opener = MagicMock()
+        if error is not None:
+            opener.open.side_effect = error
+        else:
+            response = opener.open.return_value.__enter__.return_value
+            response.read.return_value = body
+            response.headers = headers or {}
+        return opener
+
+    return _make
+
+
 class TestPyPIFetching:
     """Test PyPI version fetching."""
 
-    def test_fetch_pypi_version_success(self, clean_environment):
-        """Test successful version fetch from PyPI."""
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps({
-            "info": {"version": "1.4.25"}
-        }).encode()
-
+    @pytest.mark.parametrize(
+        "body, expected",
+        [
+            (json.dumps({"info": {"version": "1.4.25"}}).encode(), "1.4.25"),
+            # Malformed response
+            (b"not json", None),
+            # Valid JSON missing 'info' key
+            (json.dumps({"releases": {}}).encode(), None),
+            # Valid JSON where 'info' exists but 'version' is missing
+            (json.dumps({"info": {"name": "albumentationsx"}}).encode(), None),
+        ],
+    )
+    def test_fetch_pypi_version_response(self, clean_environment, pypi_opener, body, expected):
+        """Test fetching the version from PyPI responses."""
         with patch("albumentations.check_version.check_connectivity", return_value=True):
-            with patch("urllib.request.build_opener") as mock_opener_builder:
-                mock_opener = MagicMock()
-                mock_opener.open.return_value.__enter__.return_value = mock_response
-                mock_opener_builder.return_value = mock_opener
-
-                assert fetch_pypi_version() == "1.4.25"
+            with patch("urllib.request.build_opener", return_value=pypi_opener(body)):
+                assert fetch_pypi_version() == expected
 
     def test_fetch_pypi_version_offline(self, clean_environment):
         """Test PyPI fetch when offline."""
         with patch("albumentations.check_version.check_connectivity", return_value=False):
             assert fetch_pypi_version() is None
 
-    def test_fetch_pypi_version_network_error(self, clean_environment):
-        """Test PyPI fetch with network error."""
+    @pytest.mark.parametrize(
+        "error",
+        [
+            urllib.error.URLError("Network error"),
+            socket.timeout("Network timeout"),
+        ],
+    )
+    def test_fetch_pypi_version_network_error(self, clean_environment, pypi_opener, error):
+        """Test PyPI fetch with network errors and timeouts."""
         with patch("albumentations.check_version.check_connectivity", return_value=True):
-            with patch("urllib.request.build_opener") as mock_opener_builder:
-                mock_opener = MagicMock()
-                mock_opener.open.side_effect = urllib.error.URLError("Network error")
-                mock_opener_builder.return_value = mock_opener
-
+            with patch("urllib.request.build_opener", return_value=pypi_opener(error=error)):
                 assert fetch_pypi_version() is None
 
-    def test_fetch_pypi_version_malformed_response(self, clean_environment):
-        """Test PyPI fetch with malformed response."""
-        mock_response = MagicMock()
-        mock_response.read.return_value = b"not json"
+    def test_fetch_pypi_version_304_not_modified(self, clean_environment, pypi_opener):
+        """Test that a 304 response keeps the cached version without parsing a body."""
+        opener = pypi_opener(error=urllib.error.HTTPError(PYPI_URL, 304, "Not Modified", {}, None))
 
         with patch("albumentations.check_version.check_connectivity", return_value=True):
-            with patch("urllib.request.build_opener") as mock_opener_builder:
-                mock_opener = MagicMock()
-                mock_opener.open.return_value.__enter__.return_value = mock_response
-                mock_opener_builder.return_value = mock_opener
-
-                assert fetch_pypi_version() is None
-
-    def test_fetch_pypi_version_timeout(self, clean_environment):
-        """Test PyPI fetch with network timeout."""
-        with patch("albumentations.check_version.check_connectivity", return_value=True):
-            with patch("urllib.request.build_opener") as mock_opener_builder:
-                mock_opener = MagicMock()
-                mock_opener.open.side_effect = socket.timeout("Network timeout")
-                mock_opener_builder.return_value = mock_opener
+            with patch("urllib.request.build_opener", return_value=opener):
+                with patch("json.loads") as mock_loads:
+                    assert _fetch_pypi_release("1.4.25", '"etag-1"') == ("1.4.25", '"etag-1"')
+                mock_loads.assert_not_called()
 
-                assert fetch_pypi_version() is None
+        request = opener.open.call_args.args[0]
+        assert request.get_header("If-none-match") == '"etag-1"'
 
-    def test_fetch_pypi_version_missing_info(self, clean_environment):
-        """Test PyPI fetch with valid JSON missing 'info' key."""
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps({"releases": {}}).encode()
+    def test_fetch_pypi_release_stores_etag(self, clean_environment, pypi_opener):
+        """Test that the ETag of a full response is returned with the version."""
+        body = json.dumps({"info": {"version": "1.4.26"}}).encode()
+        opener = pypi_opener(body, headers={"ETag": '"etag-2"'})
 
         with patch("albumentations.check_version.check_connectivity", return_value=True):
-            with patch("urllib.request.build_opener") as mock_opener_builder:
-                mock_opener = MagicMock()
-                mock_opener.open.return_value.__enter__.return_value = mock_response
-                mock_opener_builder.return_value = mock_opener
+            with patch("urllib.request.build_opener", return_value=opener):
+                assert _fetch_pypi_release() == ("1.4.26", '"etag-2"')
 
-                assert fetch_pypi_version() is None
-
-    def test_fetch_pypi_version_missing_version(self, clean_environment):
-        """Test PyPI fetch with valid JSON where 'info' exists but 'version' is missing."""
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps({"info": {"name": "albumentationsx"}}).encode()
-
-        with patch("albumentations.check_version.check_connectivity", return_value=True):
-            with patch("urllib.request.build_opener") as mock_opener_builder:
-                mock_opener = MagicMock()
-                mock_opener.open.return_value.__enter__.return_value = mock_response
-                mock_opener_builder.return_value = mock_opener
-
-                assert fetch_pypi_version() is None
+        # Without a cached version the request is unconditional
+        request = opener.open.call_args.args[0]
+        assert request.get_header("If-none-match") is None
 
 
 class TestGetLatestVersion:
@@ -332,24 +442,52 @@ class TestGetLatestVersion:
 
         # Test that other values don't disable
         monkeypatch.setenv(ENV_NO_UPDATE, "0")
-        with patch("albumentations.check_version.fetch_pypi_version", return_value="1.4.25"):
+        with patch("albumentations.check_version._fetch_pypi_release", return_value=("1.4.25", "")):
             assert get_latest_version() == "1.4.25"
 
     def test_get_latest_version_from_cache(self, clean_environment, temp_cache_file):
-        """Test getting version from cache."""
+        """Test getting version from cache without touching the network."""
         write_cache("1.4.25")
-        assert get_latest_version() == "1.4.25"
+        with patch("albumentations.check_version.check_connectivity") as mock_connectivity:
+            assert get_latest_version() == "1.4.25"
+        mock_connectivity.assert_not_called()
+
+    def test_get_latest_version_memoized_within_process(self, clean_environment, temp_cache_file):
+        """Test that the cache file is read at most once per process."""
+        write_cache("1.4.25")
+        set_memo(None)
+
+        with patch("albumentations.check_version._read_cache_record", wraps=_read_cache_record) as mock_read:
+            assert get_latest_version() == "1.4.25"
+            assert get_latest_version() == "1.4.25"
+            assert get_latest_version() == "1.4.25"
+
+        mock_read.assert_called_once()
+
+    def test_get_latest_version_memo_expires(self, clean_environment, temp_cache_file):
+        """Test that an expired in-process copy falls back to the cache file and PyPI."""
+        expired = time.time() - CACHE_SECONDS - 3600
+        temp_cache_file.write_bytes(struct.pack("<d", expired) + b"1.4.25\0\0")
+        set_memo(("1.4.25", expired))
+
+        with patch("albumentations.check_version._fetch_pypi_release", return_value=("1.4.26", "")):
+            assert get_latest_version() == "1.4.26"
+
+        # The written record updates the in-process copy as well
+        with patch("albumentations.check_version._read_cache_record") as mock_read:
+            assert get_latest_version() == "1.4.26"
+        mock_read.assert_not_called()
 
     def test_get_latest_version_fetch_and_cache(self, clean_environment, temp_cache_file):
         """Test fetching and caching latest version."""
-        with patch("albumentations.check_version.fetch_pypi_version", return_value="1.4.26"):
+        with patch("albumentations.check_version._fetch_pypi_release", return_value=("1.4.26", "")):
             assert get_latest_version() == "1.4.26"
             # Verify it was cached
             assert read_cache() == "1.4.26"
 
     def test_get_latest_version_fetch_failure(self, clean_environment, temp_cache_file):
         """Test when PyPI fetch fails."""
-        with patch("albumentations.check_version.fetch_pypi_version", return_value=None):
+        with patch("albumentations.check_version._fetch_pypi_release", return_value=None):
             assert get_latest_version() is None
 
     def test_get_latest_version_corrupted_cache(self, clean_environment, temp_cache_file):
@@ -359,11 +497,28 @@ class TestGetLatestVersion:
             f.write("{ invalid json }")
 
         # Should fall back to fetching from PyPI
-        with patch("albumentations.check_version.fetch_pypi_version", return_value="1.4.27"):
+        with patch("albumentations.check_version._fetch_pypi_release", return_value=("1.4.27", "")):
             assert get_latest_version() == "1.4.27"
             # Verify it was re-cached correctly
             assert read_cache() == "1.4.27"
 
+    def test_get_latest_version_expired_cache_is_conditional(self, clean_environment, temp_cache_file):
+        """Test that an expired cache entry is revalidated with its ETag."""
+        write_cache("1.4.25", '"etag-1"')
+        old_time = time.time() - CACHE_SECONDS - 3600
+        temp_cache_file.write_bytes(struct.pack("<d", old_time) + temp_cache_file.read_bytes()[8:])
+        set_memo(None)
+
+        with patch(
+            "albumentations.check_version._fetch_pypi_release",
+            return_value=("1.4.25", '"etag-1"'),
+        ) as mock_fetch:
+            assert get_latest_version() == "1.4.25"
+
+        mock_fetch.assert_called_once_with("1.4.25", '"etag-1"')
+        # The revalidated entry is fresh again
+        assert read_cache() == "1.4.25"
+
 
 class TestCheckForUpdates:
     """Test the main check_for_updates function."""
@@ -397,6 +552,15 @@ class TestCheckForUpdates:
                 captured = capsys.readouterr()
                 assert captured.out == ""
 
+    def test_check_for_updates_same_version_skips_parsing(self, clean_environment):
+        """Test that identical version strings are not parsed."""
+        with patch("albumentations.check_version.get_latest_version", return_value="1.4.0"):
+            with patch("albumentations.check_version.current_version", "1.4.0"):
+                with patch("albumentations.check_version.parse_version") as mock_parse:
+                    assert check_for_updates(verbose=True) == (False, "1.4.0")
+
+                mock_parse.assert_not_called()
+
     def test_check_for_updates_no_latest(self, clean_environment):
         """Test when latest version can't be determined."""
         with patch("albumentations.check_version.get_latest_version", return_value=None):
@@ -405,14 +569,24 @@ class TestCheckForUpdates:
             assert update_available is False
             assert latest is None
 
-    def test_check_for_updates_invalid_versions(self, clean_environment):
-        """Test with unparsable version strings."""
-        with patch("albumentations.check_version.get_latest_version", return_value="invalid-version"):
-            with patch("albumentations.check_version.current_version", "also-invalid"):
-                update_available, latest = check_for_updates()
+    @pytest.mark.parametrize(
+        "latest_version, current",
+        [
+            ("invalid-version", "also-invalid"),
+            ("invalid-version", "1.4.0"),
+            ("1.5.0", "unknown"),
+        ],
+    )
+    def test_check_for_updates_invalid_versions(self, clean_environment, latest_version, current):
+        """Test that no update is reported when either version can't be parsed."""
+        with patch("albumentations.check_version.get_latest_version", return_value=latest_version):
+            with patch("albumentations.check_version.current_version", current):
+                with warnings.catch_warnings():
+                    warnings.simplefilter("error")
+                    update_available, latest = check_for_updates()
 
                 assert update_available is False
-                assert latest == "invalid-version"
+                assert latest == latest_version
 
     def test_check_for_updates_silent(self, clean_environment, capsys):
         """Test silent mode (verbose=False)."""
@@ -424,15 +598,16 @@ class TestCheckForUpdates:
                 assert update_available is True
                 assert latest == "1.5.0"
 
-                # Should not emit any warnings in silent mode
+                # Should not emit any warnings or output in silent mode
                 assert len(warning_list) == 0
+                assert capsys.readouterr() == ("", "")
 
     def test_check_for_updates_disabled_by_env(self, clean_environment, monkeypatch):
         """Test that NO_ALBUMENTATIONS_UPDATE disables update check."""
         monkeypatch.setenv(ENV_NO_UPDATE, "1")
 
         # Even with a newer version "available", check should be disabled
-        with patch("albumentations.check_version.fetch_pypi_version", return_value="1.5.0"):
+        with patch("albumentations.check_version._fetch_pypi_release", return_value=("1.5.0", "")):
             with patch("albumentations.check_version.current_version", "1.4.0"):
                 # Should not emit any warnings
                 with warnings.catch_warnings(record=True) as warning_list:
@@ -466,7 +641,7 @@ class TestIntegration:
         else:
             # If we got a version, it should be valid semantic version
             parsed = parse_version(version)
-            assert parsed is not None, f"Version '{version}' is not a valid semantic version"
+            assert parsed != INVALID_VERSION, f"Version '{version}' is not a valid semantic version"
 
 
 class TestEdgeCases:
@@ -494,8 +669,8 @@ class TestEdgeCases:
 
         # Should have handled concurrent access without crashing
         assert len(results) == 10
-        # At least some reads should succeed (concurrent file I/O isn't guaranteed)
-        assert any(r is not None for r in results)
+        # Writes are atomic, so every read sees a complete record
+        assert all(r is not None for r in results)
 
         # Verify final cache state is valid
         final_version = read_cache()
@@ -506,7 +681,10 @@ class TestEdgeCases:
         assert final_version in expected_versions, f"Final version {final_version} should be one of the written versions"
 
         # Verify the cache file can be parsed (not corrupted)
-        assert parse_version(final_version) is not None, "Final cache value should be a valid version"
+        assert parse_version(final_version) != INVALID_VERSION, "Final cache value should be a valid version"
+
+        # Every temporary file was renamed into place
+        assert [path.name for path in temp_cache_file.parent.iterdir()] == [temp_cache_file.name]
 
     def test_concurrent_cache_corruption(self, temp_cache_file):
         """Test handling of cache corruption during concurrent access."""
@@ -581,4 +759,4 @@ class TestEdgeCases:
         final_state = read_cache()
         if final_state is not None:
             # If there's a final state, it should be parseable (not corrupted)
-            assert parse_version(final_state) is not None, "Final cache should be valid if it exists"
+            assert parse_version(final_state) != INVALID_VERSION, "Final cache should be valid if it exists"
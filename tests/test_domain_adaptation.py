@@ -1,7 +1,18 @@
 import numpy as np
 import pytest
-
-from albumentations.augmentations.mixing.domain_adaptation_functional import PCA, MinMaxScaler, StandardScaler, apply_histogram
+from albucore import add_weighted
+
+import albumentations as A
+from albumentations.augmentations.mixing.domain_adaptation_functional import (
+    MAX_OPENCV_CHANNELS,
+    PCA,
+    MinMaxScaler,
+    StandardScaler,
+    _channel_histograms,
+    adapt_pixel_distribution,
+    apply_histogram,
+    fourier_domain_adaptation,
+)
 import numpy as np
 import pytest
 from skimage.exposure import match_histograms as skimage_match_histograms
@@ -70,6 +81,20 @@ def test_standard_scaler(data, expected):
     np.testing.assert_almost_equal(result, expected)
 
 
+@pytest.mark.parametrize("dtype", [np.uint8, np.int64, np.float32, np.float64])
+@pytest.mark.parametrize("num_features", [1, 3, 600])
+def test_standard_scaler_fit_matches_float64_statistics(dtype, num_features):
+    rng = np.random.default_rng(137)
+    data = rng.integers(0, 256, (2000, num_features)).astype(dtype)
+
+    scaler = StandardScaler()
+    scaler.fit(data)
+
+    np.testing.assert_allclose(scaler.mean, data.astype(np.float64).mean(axis=0), rtol=1e-6)
+    np.testing.assert_allclose(scaler.var, data.astype(np.float64).var(axis=0), rtol=1e-6)
+    np.testing.assert_allclose(scaler.scale, np.sqrt(scaler.var), rtol=1e-6)
+
+
 @pytest.mark.parametrize(
     "data, data_scaled, expected",
     [
@@ -360,6 +385,57 @@ def test_apply_histogram_identity():
 
     np.testing.assert_array_almost_equal(result, img)
 
+
+def _reference_match_histograms(img, reference_image):
+    # Per channel bincount implementation, a 2D image is matched column by column
+    matched = np.empty_like(img)
+    for channel in range(img.shape[-1]):
+        source, template = img[..., channel], reference_image[..., channel]
+        src_counts = np.bincount(source.reshape(-1))
+        tmpl_counts = np.bincount(template.reshape(-1))
+        tmpl_values = np.nonzero(tmpl_counts)[0]
+        src_quantiles = np.cumsum(src_counts) / source.size
+        tmpl_quantiles = np.cumsum(tmpl_counts[tmpl_values]) / template.size
+        interp_values = np.interp(src_quantiles, tmpl_quantiles, tmpl_values)
+        matched[..., channel] = interp_values[source].astype(np.uint8)
+    return matched
+
+
+@pytest.mark.parametrize("blend_ratio", [0.5, 1.0])
+def test_histogram_matching_2d_uint8(blend_ratio):
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (20, 30), dtype=np.uint8)
+    reference_image = rng.integers(0, 128, (20, 30), dtype=np.uint8)
+
+    transform = A.HistogramMatching(blend_ratio=(blend_ratio, blend_ratio), p=1)
+    result = transform(image=img, hm_metadata=[reference_image])["image"]
+
+    expected = add_weighted(_reference_match_histograms(img, reference_image), blend_ratio, img, 1 - blend_ratio)
+    assert result.shape == img.shape
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize(
+    "shape",
+    [
+        (10, 12),
+        (10, 12, 3),
+        (4, 4, MAX_OPENCV_CHANNELS + 1),
+    ],
+)
+def test_channel_histograms(shape):
+    image = np.random.randint(0, 256, shape, dtype=np.uint8)
+    num_channels = shape[-1]
+
+    result = _channel_histograms(image, num_channels)
+
+    expected = np.stack(
+        [np.bincount(image[..., channel].reshape(-1), minlength=256) for channel in range(num_channels)],
+    )
+    assert result.dtype == np.int64
+    np.testing.assert_array_equal(result, expected)
+
+
 def generate_random_image(shape, dtype=np.uint8):
     if dtype == np.uint8:
         return np.random.randint(0, 256, shape, dtype=dtype)
@@ -418,3 +494,85 @@ def test_match_histograms_different_shapes():
     reference = generate_random_image((50, 50, 3), np.uint8)
     result = our_match_histograms(source, reference)
     assert result.shape == source.shape
+
+
+def _reference_fourier_domain_adaptation(img, target_img, beta):
+    # Straightforward per-channel implementation on the fftshift-ed spectrum
+    src_img = np.atleast_3d(img.astype(np.float32))
+    trg_img = np.atleast_3d(target_img.astype(np.float32))
+    height, width = src_img.shape[:2]
+    border = int(np.floor(min(height, width) * beta))
+    center_x, center_y = width / 2 - 0.5, height / 2 - 0.5
+    h1, h2 = max(0, int(center_y - border)), min(int(center_y + border), height)
+    w1, w2 = max(0, int(center_x - border)), min(int(center_x + border), width)
+
+    result = np.zeros_like(src_img)
+    for channel in range(src_img.shape[-1]):
+        fft_src = np.fft.fftshift(np.fft.fft2(src_img[..., channel]))
+        fft_trg = np.fft.fftshift(np.fft.fft2(trg_img[..., channel]))
+        amp_src, pha_src = np.abs(fft_src), np.angle(fft_src)
+        amp_src[h1:h2, w1:w2] = np.abs(fft_trg)[h1:h2, w1:w2]
+        result[..., channel] = np.real(np.fft.ifft2(np.fft.ifftshift(amp_src * np.exp(1j * pha_src))))
+    return result
+
+
+@pytest.mark.parametrize("shape", [(100, 100, 3), (101, 57, 3), (64, 80, 1), (50, 51, 4)])
+@pytest.mark.parametrize("beta", [0.0, 0.05, 0.1, 0.5])
+def test_fourier_domain_adaptation_matches_reference(shape, beta):
+    rng = np.random.default_rng(0)
+    img = rng.random(shape, dtype=np.float32)
+    target_img = rng.random(shape, dtype=np.float32)
+
+    result = fourier_domain_adaptation(img, target_img, beta)
+    expected = np.clip(_reference_fourier_domain_adaptation(img, target_img, beta), 0, 1)
+
+    assert result.shape == img.shape
+    assert result.dtype == np.float32
+    assert result.flags.c_contiguous
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+
+
+@pytest.mark.parametrize("transform_type", ["pca", "standard", "minmax"])
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32])
+@pytest.mark.parametrize(
+    "img_shape, ref_shape",
+    [
+        ((64, 64, 3), (64, 64, 3)),
+        ((48, 64, 3), (64, 40, 3)),
+        ((64, 48, 1), (32, 40, 1)),
+    ],
+)
+def test_adapt_pixel_distribution_moves_towards_reference(transform_type, dtype, img_shape, ref_shape):
+    rng = np.random.default_rng(137)
+    img = rng.random(img_shape, dtype=np.float32)
+    ref = rng.random(ref_shape, dtype=np.float32) * 0.3 + 0.5
+    if dtype == np.uint8:
+        img = (img * 255).astype(np.uint8)
+        ref = (ref * 255).astype(np.uint8)
+    else:
+        ref = ref.astype(np.float32)
+
+    result = adapt_pixel_distribution(img, ref, transform_type=transform_type, weight=1.0)
+
+    assert result.shape == img.shape
+    assert result.dtype == dtype
+    np.testing.assert_allclose(result.mean(axis=(0, 1)), ref.mean(axis=(0, 1)), rtol=0.05)
+
+
+@pytest.mark.parametrize("scaler_cls", [MinMaxScaler, StandardScaler])
+def test_scaler_compose_inverse_with_matches_round_trip(scaler_cls):
+    rng = np.random.default_rng(137)
+    source_data = rng.integers(0, 256, (1000, 3)).astype(np.float64)
+    target_data = rng.integers(50, 200, (1000, 3)).astype(np.float64)
+
+    source, target = scaler_cls(), scaler_cls()
+    source.fit(source_data)
+    target.fit(target_data)
+
+    coef, bias = target.compose_inverse_with(source)
+
+    np.testing.assert_allclose(
+        source_data * coef + bias,
+        target.inverse_transform(source.transform(source_data)),
+        rtol=1e-6,
+    )
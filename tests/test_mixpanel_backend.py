@@ -117,7 +117,8 @@ class TestMixpanelBackend:
         props = sent_data["properties"]
         assert props["distinct_id"] == "test-user-123"
         assert props["token"] == backend.PROJECT_TOKEN
-        assert props["$insert_id"] == "session-456"  # For deduplication
+        assert props["$insert_id"] == "session-456-test_hash"  # For deduplication
+        assert props["session_id"] == "session-456"
 
         # Check all fields are included
         assert props["pipeline_hash"] == "test_hash"
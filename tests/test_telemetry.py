@@ -2,18 +2,27 @@
 
 from __future__ import annotations
 
+import os
+import threading
 import time
+from datetime import datetime
 from unittest.mock import Mock, patch
 import pytest
 import numpy as np
 
 import albumentations as A
 from albumentations.core.analytics.settings import settings
-from albumentations.core.analytics.telemetry import TelemetryClient, get_telemetry_client
-from albumentations.core.analytics.events import ComposeInitEvent
+from albumentations.core.analytics.telemetry import (
+    BackgroundSender,
+    TelemetryClient,
+    get_sender,
+    get_telemetry_client,
+)
+from albumentations.core.analytics.events import ComposeInitEvent, get_session_id
 from albumentations.core.analytics.collectors import (
     get_environment_info,
     collect_pipeline_info,
+    reset_environment_cache,
 )
 
 
@@ -28,12 +37,16 @@ def reset_telemetry_client():
     TelemetryClient._instance = None
     TelemetryClient._initialized = False
 
+    # Environment info is cached per process, tests change the environment
+    reset_environment_cache()
+
     yield
 
     # Clean up after test
     albumentations.core.analytics.telemetry.telemetry_client = None
     TelemetryClient._instance = None
     TelemetryClient._initialized = False
+    reset_environment_cache()
 
 
 class TestTelemetrySettings:
@@ -148,6 +161,125 @@ class TestTelemetryClient:
         client.track_compose_init(event2, telemetry=True)
         assert client.last_send_time == old_time  # Should not update
 
+    def test_concurrent_duplicates_sent_once(self):
+        """Test that concurrent calls with the same pipeline send a single event."""
+        client = TelemetryClient()
+        client.enable()
+        client.reset()
+        client.rate_limit = 0
+
+        with patch.object(client, "_send_event") as mock_send:
+            threads = [
+                threading.Thread(
+                    target=client.track_compose_init,
+                    args=({"pipeline_hash": "concurrent_hash", "transforms": ["Blur"]},),
+                    kwargs={"use_thread": False},
+                )
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        client.rate_limit = 30.0
+        assert mock_send.call_count == 1
+
+    def test_sent_event_gets_timestamp_and_session_id(self):
+        """Test that the event metadata is filled in when the event is sent."""
+        client = TelemetryClient()
+        client.enable()
+        client.reset()
+
+        with patch.object(client, "_send_event") as mock_send:
+            client.track_compose_init({"pipeline_hash": "meta_hash", "transforms": ["Blur"]}, use_thread=False)
+
+        event = mock_send.call_args.args[0]
+        assert event.user_id
+        assert event.session_id == get_session_id()
+        assert len(event.session_id) == 32
+        assert datetime.fromisoformat(event.timestamp).tzinfo is not None
+
+    def test_sender_drain_is_bounded_by_timeout(self):
+        """Test that a blocked send can't make the exit drain wait longer than its timeout."""
+        sender = BackgroundSender()
+        release = threading.Event()
+        sender.submit(release.wait)
+
+        start = time.perf_counter()
+        assert not sender.drain(timeout=0.05)
+        assert time.perf_counter() - start < 1.0
+
+        release.set()
+        assert sender.drain(timeout=1.0)
+
+    def test_sender_drain_without_worker_does_not_block(self):
+        """Test that draining returns at once when the worker thread doesn't run, e.g. after a fork."""
+        sender = BackgroundSender()
+
+        with patch.object(sender, "is_alive", return_value=False):
+            start = time.perf_counter()
+            assert not sender.drain(timeout=5.0)
+            assert time.perf_counter() - start < 1.0
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+    def test_sender_runs_in_forked_child(self):
+        """Test that a forked child gets its own live worker that delivers events."""
+        parent_sender = get_sender()
+        read_fd, write_fd = os.pipe()
+
+        pid = os.fork()
+        if pid == 0:  # child
+            try:
+                sender = get_sender()
+                delivered = threading.Event()
+                sender.submit(delivered.set)
+                ok = (
+                    sender is not parent_sender
+                    and sender.is_alive()
+                    and sender.drain(timeout=5.0)
+                    and delivered.is_set()
+                )
+                os.write(write_fd, b"1" if ok else b"0")
+            finally:
+                os._exit(0)
+
+        os.close(write_fd)
+        try:
+            result = os.read(read_fd, 1)
+        finally:
+            os.close(read_fd)
+            os.waitpid(pid, 0)
+
+        assert result == b"1"
+        assert get_sender() is parent_sender
+        assert parent_sender.is_alive()
+
+    def test_sender_drops_calls_when_queue_is_full(self):
+        """Test that calls submitted while the worker is stuck are dropped once the queue is full."""
+        with patch.object(BackgroundSender, "max_pending", 2):
+            sender = BackgroundSender()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def blocked():
+            started.set()
+            release.wait()
+
+        assert sender.submit(blocked)
+        assert started.wait(1.0)
+
+        assert sender.submit(calls.append, 1)
+        assert sender.submit(calls.append, 2)
+        assert not sender.submit(calls.append, 3)
+        # A full queue can't make the drain wait longer than its timeout either
+        assert not sender.drain(timeout=0.05)
+
+        release.set()
+        assert sender.drain(timeout=1.0)
+        assert calls == [1, 2]
+
     def test_track_compose_init_when_disabled_globally(self):
         """Test that tracking is skipped when telemetry is disabled globally."""
         # Disable telemetry
@@ -221,6 +353,10 @@ class TestCIEnvironmentDetection:
         # Test when no CI variables are set
         assert is_ci_environment() is False
 
+        # Variables that are set but empty don't count
+        monkeypatch.setenv("CI", "")
+        assert is_ci_environment() is False
+
     def test_pytest_detection(self, monkeypatch):
         """Test pytest environment detection."""
         from albumentations.core.analytics.collectors import is_pytest_running
@@ -266,6 +402,47 @@ class TestCIEnvironmentDetection:
         monkeypatch.setenv("COLAB_GPU", "1")  # Also set Colab
         assert detect_environment() == "ci"  # Still returns CI
 
+    @pytest.mark.parametrize(
+        "dockerenv_exists, cgroup, expected",
+        [
+            (True, b"0::/\n", True),
+            (False, b"12:memory:/docker/4a5b6c\n0::/\n", True),
+            (False, b"0::/system.slice/containerd.service/kubepods-burstable.slice\n", True),
+            (False, b"0::/user.slice/user-1000.slice/session-2.scope\n", False),
+            (False, OSError(), False),
+        ],
+    )
+    def test_docker_detection(self, dockerenv_exists, cgroup, expected):
+        """Test that only containers are detected as Docker, not every host with cgroups."""
+        from albumentations.core.analytics import collectors
+
+        with (
+            patch.object(collectors.Path, "exists", return_value=dockerenv_exists),
+            patch.object(collectors.Path, "read_bytes", side_effect=[cgroup]),
+        ):
+            assert collectors._is_docker() is expected
+
+    @pytest.mark.parametrize(
+        "env, modules, expected",
+        [
+            ({"COLAB_RELEASE_TAG": "release-colab_20240101"}, {}, True),
+            ({}, {"google.colab": Mock()}, True),
+            ({}, {}, False),
+        ],
+    )
+    def test_colab_detection(self, monkeypatch, env, modules, expected):
+        """Test that Colab is detected from its environment variable or imported module."""
+        from albumentations.core.analytics import collectors
+
+        monkeypatch.delenv("COLAB_RELEASE_TAG", raising=False)
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        monkeypatch.delitem(collectors.sys.modules, "google.colab", raising=False)
+        for key, value in modules.items():
+            monkeypatch.setitem(collectors.sys.modules, key, value)
+
+        assert collectors._is_colab() is expected
+
     def test_compose_no_telemetry_in_ci(self, monkeypatch):
         """Test that Compose doesn't send telemetry in CI environments."""
         # Since we're already in pytest, telemetry is disabled
@@ -338,6 +515,35 @@ class TestComposeIntegration:
         finally:
             settings.update(telemetry=True)
 
+    @pytest.mark.parametrize("telemetry", [True, False])
+    @patch('albumentations.core.composition.get_environment_info')
+    @patch('albumentations.core.composition.collect_pipeline_info')
+    def test_compose_skips_collectors_when_client_inactive(self, mock_collect_pipeline, mock_get_env, telemetry):
+        """Test that no telemetry data is collected when the client would drop the event."""
+        # The real client is disabled because we're running in pytest
+        A.Compose([A.HorizontalFlip(p=0.5)], telemetry=telemetry)
+
+        mock_get_env.assert_not_called()
+        mock_collect_pipeline.assert_not_called()
+
+    def test_compose_skips_environment_info_for_sent_pipeline(self):
+        """Test that a pipeline that was already sent doesn't collect environment info again."""
+        client = TelemetryClient()
+        client.enable()
+        client.reset()
+
+        with (
+            patch("albumentations.core.composition.get_telemetry_client", return_value=client),
+            patch("albumentations.core.composition.get_environment_info", return_value={}) as mock_get_env,
+            patch.object(client, "_send_event"),
+        ):
+            A.Compose([A.HorizontalFlip(p=0.5)])
+            client.last_send_time = 0  # Bypass rate limit
+            A.Compose([A.HorizontalFlip(p=0.5)])
+            get_sender().drain()
+
+        mock_get_env.assert_called_once()
+
     def test_compose_telemetry_never_raises(self):
         """Test that telemetry errors never affect user code."""
         # Make telemetry collection raise an exception
@@ -380,6 +586,129 @@ class TestDataCollectors:
         # e.g., "Ubuntu 22.04", "macOS 14.2", "Windows 11"
         assert info['os'] and len(info['os']) > 0
 
+    def test_get_environment_info_is_cached(self):
+        """Test that environment info is collected once until the cache is reset."""
+        with patch('albumentations.core.analytics.collectors.is_ci_environment', return_value=False) as is_ci:
+            info = get_environment_info()
+            info["environment"] = "modified"
+
+            assert get_environment_info()["environment"] != "modified"
+            assert is_ci.call_count == 1
+
+            reset_environment_cache()
+            get_environment_info()
+            assert is_ci.call_count == 2
+
+    def test_get_environment_info_concurrent_first_calls_collect_once(self):
+        """Test that threads asking for environment info at the same time run the probes once."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def slow_check():
+            time.sleep(0.05)
+            return False
+
+        with patch('albumentations.core.analytics.collectors.is_ci_environment', side_effect=slow_check) as is_ci:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: get_environment_info(), range(8)))
+
+        assert is_ci.call_count == 1
+        assert all(result == results[0] for result in results)
+
+    def test_macos_probes_do_not_start_processes(self):
+        """Test that CPU and RAM are read with sysctlbyname when it is available."""
+        from albumentations.core.analytics import collectors
+
+        values = {
+            "machdep.cpu.brand_string": b"Apple M2\x00",
+            "hw.memsize": (16 * 1024**3).to_bytes(8, "little"),
+        }
+        with (
+            patch.object(collectors, "_sysctl_value", side_effect=values.get),
+            patch.object(collectors.sys, "byteorder", "little"),
+            patch.object(collectors, "_SYSTEM", "Darwin"),
+            patch.object(collectors.platform, "processor", return_value="arm"),
+            patch("subprocess.run") as mock_run,
+        ):
+            assert collectors.get_cpu_model() == "Apple M2"
+            assert collectors.get_ram_size() == 16.0
+            mock_run.assert_not_called()
+
+    def test_gpu_name_does_not_import_torch(self):
+        """Test that the GPU is only queried when torch is already imported."""
+        from albumentations.core.analytics import collectors
+
+        with patch.dict(collectors.sys.modules, {"torch": None}):
+            assert collectors.get_gpu_name() is None
+
+        collectors.get_gpu_name.cache_clear()
+        torch = Mock()
+        torch.cuda.is_available.return_value = True
+        torch.cuda.get_device_name.return_value = "Tesla T4"
+        with patch.dict(collectors.sys.modules, {"torch": torch}):
+            assert collectors.get_gpu_name() == "Tesla T4"
+            assert collectors.get_gpu_name() == "Tesla T4"
+        torch.cuda.get_device_name.assert_called_once_with(0)
+
+    @pytest.mark.parametrize(
+        "returncode, stdout, expected",
+        [
+            (0, "17179869184\n", "17179869184"),
+            (1, "", None),
+        ],
+    )
+    def test_run_command(self, returncode, stdout, expected):
+        """Test that fallback commands are detached from the terminal and their output is stripped."""
+        import subprocess
+
+        from albumentations.core.analytics import collectors
+
+        with patch("subprocess.run", return_value=Mock(returncode=returncode, stdout=stdout)) as mock_run:
+            assert collectors._run_command("sysctl", "-n", "hw.memsize") == expected
+
+        kwargs = mock_run.call_args.kwargs
+        assert kwargs["stdin"] == subprocess.DEVNULL
+        assert kwargs["start_new_session"] is True
+        assert kwargs["close_fds"] is True
+
+    @pytest.mark.parametrize(
+        "os_release, expected",
+        [
+            ('PRETTY_NAME="Ubuntu 22.04.3 LTS"\nNAME="Ubuntu"\n', "Ubuntu 22.04.3 LTS"),
+            ('NAME="Fedora Linux"\nPRETTY_NAME="Fedora Linux 39"', "Fedora Linux 39"),
+            ('NAME="Custom"\nX_PRETTY_NAME="Not this"\n', "Linux"),
+        ],
+    )
+    def test_get_linux_os_info_from_os_release(self, os_release, expected):
+        """Test that the distribution name is parsed from /etc/os-release when platform can't provide it."""
+        from albumentations.core.analytics import collectors
+
+        with (
+            patch.object(collectors.platform, "freedesktop_os_release", side_effect=OSError, create=True),
+            patch.object(collectors.Path, "read_text", return_value=os_release),
+        ):
+            assert collectors._get_linux_os_info() == expected
+
+    def test_run_command_missing_executable(self):
+        """Test that a command that can't be started returns None."""
+        from albumentations.core.analytics import collectors
+
+        assert collectors._run_command("albumentations-missing-command") is None
+
+    @pytest.mark.parametrize(
+        "meminfo, expected",
+        [
+            (b"MemTotal:       16318340 kB\nMemFree:         1234567 kB\n", 15.6),
+            (b"MemFree:         1234567 kB\nMemTotal:       8159170 kB", 7.8),
+            (b"MemFree:         1234567 kB\n", None),
+        ],
+    )
+    def test_get_ram_linux(self, meminfo, expected):
+        """Test that the total RAM is parsed from /proc/meminfo."""
+        from albumentations.core.analytics import collectors
+
+        with patch.object(collectors.Path, "read_bytes", return_value=meminfo):
+            assert collectors._get_ram_linux() == expected
+
     def test_collect_pipeline_info(self):
         """Test pipeline info collection."""
         compose = A.Compose([
@@ -500,6 +829,10 @@ class TestComposeInitEvent:
         assert hash1 != hash3
         assert hash2 != hash3
 
+        # Same pipeline should always produce the same 32 character hash
+        assert ComposeInitEvent.generate_pipeline_hash(list(transforms1)) == hash1
+        assert len(hash1) == 32
+
     def test_event_data_for_mixpanel(self):
         """Test event data structure is suitable for Mixpanel."""
         event = ComposeInitEvent(